@@ -10,7 +10,9 @@ from Tune import LOGGER, app, userbot
 from Tune.core.call import JARVIS
 from Tune.misc import sudo
 from Tune.plugins import ALL_MODULES
-from Tune.utils.database import get_banned_users, get_gbanned
+from Tune.utils.chatsettings import chat_settings
+from Tune.utils.database import get_banned_users, get_gbanned, load_membership
+from Tune.utils.scheduler import scheduler
 from Tune.utils.cookie_handler import fetch_and_store_cookies 
 from config import BANNED_USERS, WEB_APP
 
@@ -37,6 +39,17 @@ async def init():
 
     await sudo()
 
+    try:
+        await chat_settings.load()
+    except Exception as e:
+        LOGGER("Tune").warning(f"ғᴀɪʟᴇᴅ ᴛᴏ ʟᴏᴀᴅ ᴄʜᴀᴛ sᴇᴛᴛɪɴɢs: {e}")
+    chat_settings.start()
+
+    try:
+        await load_membership()
+    except Exception as e:
+        LOGGER("Tune").warning(f"ғᴀɪʟᴇᴅ ᴛᴏ ʟᴏᴀᴅ ᴍᴇᴍʙᴇʀsʜɪᴘ ɪɴᴅᴇx: {e}")
+
     try:
         users = await get_gbanned()
         for user_id in users:
@@ -58,6 +71,7 @@ async def init():
         importlib.import_module("Tune.plugins" + all_module)
 
     LOGGER("Tune.plugins").info("ᴛᴜɴᴇ's ᴍᴏᴅᴜʟᴇs ʟᴏᴀᴅᴇᴅ...")
+    scheduler.start()
     await userbot.start()
     await JARVIS.start()
 
@@ -76,6 +90,8 @@ async def init():
         "\x54\x75\x6e\x65\x20\x56\x69\x61\x20\x4d\x75\x73\x69\x63\x20\x42\x6f\x74\x20\x53\x74\x61\x72\x74\x65\x64\x20\x53\x75\x63\x63\x65\x73\x73\x66\x75\x6c\x6c\x79\x2e"
     )
     await idle()
+    await scheduler.stop()
+    await chat_settings.stop()
     await app.stop()
     await userbot.stop()
     LOGGER("Tune").info("sᴛᴏᴘᴘɪɴɢ ᴛᴜɴᴇ ᴠɪᴀ ᴍᴜsɪᴄ ʙᴏᴛ ...")
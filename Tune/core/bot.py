@@ -3,8 +3,12 @@ from pyrogram import Client, errors
 from pyrogram.enums import ChatMemberStatus
 
 import config
+from .fileids import file_ids
 from ..logging import LOGGER
 
+# raised when a remembered file_id can no longer be used
+_STALE_FILE_ID = (errors.FileIdInvalid, errors.FileReferenceExpired, errors.MediaEmpty)
+
 
 class JARVIS(Client):
     def __init__(self):
@@ -19,6 +23,40 @@ class JARVIS(Client):
         )
         LOGGER(__name__).info("Bot client initialized.")
 
+    async def _reuse_upload(self, media, send):
+        """Send ``media`` through its remembered file_id if there is one, else upload it and remember."""
+        cached = await file_ids.lookup(media)
+        if cached is not media:
+            try:
+                return await send(cached)
+            except _STALE_FILE_ID:
+                await file_ids.forget(media)
+        message = await send(media)
+        await file_ids.remember(media, message)
+        return message
+
+    async def send_photo(self, chat_id, photo, *args, **kwargs):
+        send = super().send_photo
+        return await self._reuse_upload(photo, lambda m: send(chat_id, m, *args, **kwargs))
+
+    async def send_video(self, chat_id, video, *args, **kwargs):
+        send = super().send_video
+        return await self._reuse_upload(video, lambda m: send(chat_id, m, *args, **kwargs))
+
+    async def send_animation(self, chat_id, animation, *args, **kwargs):
+        send = super().send_animation
+        return await self._reuse_upload(animation, lambda m: send(chat_id, m, *args, **kwargs))
+
+    async def edit_message_media(self, chat_id, message_id, media, *args, **kwargs):
+        send = super().edit_message_media
+        source = media.media
+
+        def edit(m):
+            media.media = m
+            return send(chat_id, message_id, media, *args, **kwargs)
+
+        return await self._reuse_upload(source, edit)
+
     async def start(self):
         await super().start()
         me = await self.get_me()
@@ -1,5 +1,4 @@
 import asyncio
-import os
 from datetime import datetime, timedelta
 from typing import Union
 
@@ -9,12 +8,14 @@ from pyrogram.errors import FloodWait, ChatAdminRequired
 from pyrogram.types import InlineKeyboardMarkup
 from pytgcalls import PyTgCalls
 from pytgcalls.exceptions import NoActiveGroupCall
-from pytgcalls.types import AudioQuality, ChatUpdate, MediaStream, StreamEnded, Update, VideoQuality
+from pytgcalls.types import ChatUpdate, MediaStream, StreamEnded, Update
 
 import config
 from strings import get_string
 from Tune import LOGGER, YouTube, app
 from Tune.misc import db
+from Tune.utils.dlqueue import Priority, download_priority
+from Tune.utils.downloader import is_growing, when_complete
 from Tune.utils.database import (
     add_active_chat,
     add_active_video_chat,
@@ -22,113 +23,59 @@ from Tune.utils.database import (
     get_loop,
     group_assistant,
     is_autoend,
+    is_music_playing,
     music_on,
     remove_active_chat,
     remove_active_video_chat,
     set_loop,
-    get_chat_topics,
 )
 from Tune.utils.exceptions import AssistantErr
-from Tune.utils.formatters import check_duration, seconds_to_min, speed_converter
+from Tune.utils.formatters import (
+    seconds_to_min,
+    tempo_filter,
+    time_to_seconds,
+)
 from Tune.utils.inline.play import stream_markup
+from Tune.utils.messaging import delete_messages, send_message_to_topics, send_photo_to_topics
+from Tune.utils.prefetch import prefetcher
+from Tune.utils.progress import progress_updater
 from Tune.utils.stream.autoclear import auto_clean
+from Tune.utils.stream.queue import ChatQueue, QueueEntry
+from Tune.utils.streamprofile import media_stream
 from Tune.utils.thumbnails import get_thumb
 from Tune.utils.errors import capture_internal_err, send_large_error
+from Tune.utils.tuning import PROGRESSIVE_RW_TIMEOUT
 
 autoend = {}
 counter = {}
+_swaps = set()
 
-def dynamic_media_stream(path: str, video: bool = False, ffmpeg_params: str = None) -> MediaStream:
-    return MediaStream(
-        audio_path=path,
-        media_path=path,
-        audio_parameters=AudioQuality.MEDIUM if video else AudioQuality.STUDIO,
-        video_parameters=VideoQuality.HD_720p if video else VideoQuality.SD_360p,
-        video_flags=(MediaStream.Flags.AUTO_DETECT if video else MediaStream.Flags.IGNORE),
-        ffmpeg_parameters=ffmpeg_params,
-    )
-
-async def send_message_to_topics(chat_id, text, reply_markup=None, disable_web_page_preview=True):
+def tempo_params(speed: float, video: bool = False) -> str:
     """
-    Send message to all topics in a chat if topics exist, otherwise send to main chat.
-    Returns the message object from the first successful send (for compatibility).
+    ffmpeg options that play the stream at ``speed`` in real time. They open the
+    per-stream ``--audio``/``--video`` sections, so they go after any shared options.
+    Video is retimed on the input side: an output ``-filter:v`` would replace the
+    ``-vf scale`` pytgcalls adds for the call's frame size.
     """
-    # Get all topics for this chat
-    topics = await get_chat_topics(chat_id)
-    
-    if not topics:
-        # No topics configured, send to main chat
-        return await app.send_message(
-            chat_id=chat_id,
-            text=text,
-            reply_markup=reply_markup,
-            disable_web_page_preview=disable_web_page_preview,
-        )
-    
-    # Send to all topics
-    messages = []
-    for topic_id in topics:
-        try:
-            message = await app.send_message(
-                chat_id=chat_id,
-                text=text,
-                reply_markup=reply_markup,
-                disable_web_page_preview=disable_web_page_preview,
-                message_thread_id=topic_id,
-            )
-            messages.append(message)
-        except Exception as e:
-            # Log error but continue with other topics
-            print(f"Failed to send message to topic {topic_id} in chat {chat_id}: {e}")
-            continue
-    
-    # Return the first message for compatibility with existing code
-    return messages[0] if messages else None
-
+    params = f"--audio -atend -filter:a {tempo_filter(speed)}"
+    if video:
+        params += f" --video -itsscale {1 / float(speed):.6g}"
+    return params
 
-async def send_photo_to_topics(chat_id, photo, caption, reply_markup=None):
-    """
-    Send photo to all topics in a chat if topics exist, otherwise send to main chat.
-    Returns the message object from the first successful send (for compatibility).
-    """
-    # Get all topics for this chat
-    topics = await get_chat_topics(chat_id)
-    
-    if not topics:
-        # No topics configured, send to main chat
-        return await app.send_photo(
-            chat_id=chat_id,
-            photo=photo,
-            caption=caption,
-            reply_markup=reply_markup,
-        )
-    
-    # Send to all topics
-    messages = []
-    for topic_id in topics:
-        try:
-            message = await app.send_photo(
-                chat_id=chat_id,
-                photo=photo,
-                caption=caption,
-                reply_markup=reply_markup,
-                message_thread_id=topic_id,
-            )
-            messages.append(message)
-        except Exception as e:
-            # Log error but continue with other topics
-            print(f"Failed to send photo to topic {topic_id} in chat {chat_id}: {e}")
-            continue
-    
-    # Return the first message for compatibility with existing code
-    return messages[0] if messages else None
 
+def dynamic_media_stream(path: str, video: bool = False, ffmpeg_params: str = None) -> MediaStream:
+    if is_growing(path):
+        # keep reading past EOF while the progressive download is still writing
+        follow = f"-follow 1 -rw_timeout {PROGRESSIVE_RW_TIMEOUT * 1000000}"
+        ffmpeg_params = f"{follow} {ffmpeg_params}" if ffmpeg_params else follow
+    return media_stream(path, video, ffmpeg_params)
 
 async def _clear_(chat_id: int) -> None:
+    prefetcher.cancel(chat_id)
     popped = db.pop(chat_id, None)
-    if popped:
-        await auto_clean(popped)
-    db[chat_id] = []
+    for entry in popped or []:
+        await auto_clean(entry)
+    db[chat_id] = ChatQueue()
     await remove_active_video_chat(chat_id)
     await remove_active_chat(chat_id)
     await set_loop(chat_id, 0)
@@ -161,17 +108,62 @@ class Call:
         self.five = PyTgCalls(self.userbot5) if self.userbot5 else None
 
         self.active_calls: set[int] = set()
-
+        self._following: dict[int, str] = {}
+
+
+    def _follow(self, chat_id: int, path: str) -> None:
+        """
+        Note what ``chat_id`` now plays. A file still being written is played with
+        ``-follow``, so once its download finishes the chat is moved onto the
+        finished file at the same position and ffmpeg ends at the real EOF.
+        """
+        done = when_complete(path) if isinstance(path, str) else None
+        if done is None:
+            self._following.pop(chat_id, None)
+            return
+        self._following[chat_id] = path
+        task = asyncio.ensure_future(self._swap_finished(chat_id, path, done))
+        _swaps.add(task)
+        task.add_done_callback(_swaps.discard)
+
+    async def _swap_finished(self, chat_id: int, path: str, done: asyncio.Future) -> None:
+        final = await done
+        # join_call plays before the track is queued; give the queue a moment to catch up
+        for _ in range(10):
+            playing = db.get(chat_id)
+            if playing or self._following.get(chat_id) != path:
+                break
+            await asyncio.sleep(0.5)
+        if not final or not playing or self._following.get(chat_id) != path:
+            return
+        self._following.pop(chat_id, None)
+        entry = playing[0]
+        entry.hold(final)
+        video = str(entry.streamtype) == "video"
+        params = f"-ss {int(entry.played * entry.speed)}"
+        if entry.speed != 1.0:
+            params += f" {tempo_params(entry.speed, video)}"
+        try:
+            assistant = await group_assistant(self, chat_id)
+            await assistant.play(chat_id, media_stream(final, video, params))
+            if not await is_music_playing(chat_id):
+                await assistant.pause(chat_id)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not move {chat_id} onto the finished download: {e}")
 
     @capture_internal_err
     async def pause_stream(self, chat_id: int) -> None:
         assistant = await group_assistant(self, chat_id)
         await assistant.pause(chat_id)
+        if db.get(chat_id):
+            db[chat_id][0].pause()
 
     @capture_internal_err
     async def resume_stream(self, chat_id: int) -> None:
         assistant = await group_assistant(self, chat_id)
         await assistant.resume(chat_id)
+        if db.get(chat_id):
+            db[chat_id][0].resume()
 
     @capture_internal_err
     async def mute_stream(self, chat_id: int) -> None:
@@ -203,7 +195,7 @@ class Call:
         try:
             check = db.get(chat_id)
             if check:
-                check.pop(0)
+                await auto_clean(check.pop(0))
         except (IndexError, KeyError):
             pass
         await remove_active_video_chat(chat_id)
@@ -224,6 +216,7 @@ class Call:
         assistant = await group_assistant(self, chat_id)
         stream = dynamic_media_stream(path=link, video=bool(video))
         await assistant.play(chat_id, stream)
+        self._follow(chat_id, link)
 
     @capture_internal_err
     async def vc_users(self, chat_id: int) -> list:
@@ -232,51 +225,52 @@ class Call:
         return [p.user_id for p in participants if not p.is_muted]
 
     @capture_internal_err
-    async def seek_stream(self, chat_id: int, file_path: str, to_seek: str, duration: str, mode: str) -> None:
+    async def seek_stream(
+        self, chat_id: int, file_path: str, to_seek: str, duration: str, mode: str, speed: float = 1.0
+    ) -> None:
         assistant = await group_assistant(self, chat_id)
-        ffmpeg_params = f"-ss {to_seek} -to {duration}"
         is_video = mode == "video"
+        if float(speed) == 1.0:
+            ffmpeg_params = f"-ss {to_seek} -to {duration}"
+        else:
+            # positions are kept in the time heard at ``speed``; seek in source time
+            source = int(time_to_seconds(to_seek) * float(speed))
+            ffmpeg_params = f"-ss {source} {tempo_params(speed, is_video)}"
         stream = dynamic_media_stream(path=file_path, video=is_video, ffmpeg_params=ffmpeg_params)
         await assistant.play(chat_id, stream)
+        self._follow(chat_id, file_path)
 
     @capture_internal_err
     async def speedup_stream(self, chat_id: int, file_path: str, speed: float, playing: list) -> None:
-        if not isinstance(playing, list) or not playing or not isinstance(playing[0], dict):
+        if not playing or not isinstance(playing[0], QueueEntry):
             raise AssistantErr("Invalid stream info for speedup.")
 
         assistant = await group_assistant(self, chat_id)
-        base = os.path.basename(file_path)
-        chatdir = os.path.join("playback", str(speed))
-        os.makedirs(chatdir, exist_ok=True)
-        out = os.path.join(chatdir, base)
-
-        if not os.path.exists(out):
-            vs = str(2.0 / float(speed))
-            cmd = f"ffmpeg -i {file_path} -filter:v setpts={vs}*PTS -filter:a atempo={speed} {out}"
-            proc = await asyncio.create_subprocess_shell(cmd, stdin=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
-            await proc.communicate()
-
-        dur = int(await asyncio.get_event_loop().run_in_executor(None, check_duration, out))
-        played, con_seconds = speed_converter(playing[0]["played"], speed)
-        duration_min = seconds_to_min(dur)
-        is_video = playing[0]["streamtype"] == "video"
-        ffmpeg_params = f"-ss {played} -to {duration_min}"
-        stream = dynamic_media_stream(path=out, video=is_video, ffmpeg_params=ffmpeg_params)
-
-        if chat_id in db and db[chat_id] and db[chat_id][0].get("file") == file_path:
+        entry = playing[0]
+        speed = float(speed)
+        source_pos = int(entry.played * entry.speed)
+        is_video = entry.streamtype == "video"
+        ffmpeg_params = f"-ss {source_pos}"
+        if speed != 1.0:
+            ffmpeg_params += f" {tempo_params(speed, is_video)}"
+        stream = dynamic_media_stream(path=file_path, video=is_video, ffmpeg_params=ffmpeg_params)
+
+        if chat_id in db and db[chat_id] and db[chat_id][0].file == file_path:
             await assistant.play(chat_id, stream)
+            self._follow(chat_id, file_path)
         else:
             raise AssistantErr("Stream mismatch during speedup.")
 
-        db[chat_id][0].update({
-            "played": con_seconds,
-            "dur": duration_min,
-            "seconds": dur,
-            "speed_path": out,
-            "speed": speed,
-            "old_dur": db[chat_id][0].get("dur"),
-            "old_second": db[chat_id][0].get("seconds"),
-        })
+        if not entry.old_dur:
+            entry.old_dur = entry.dur
+            entry.old_second = entry.seconds
+        if speed == 1.0:
+            entry.reset_speed()
+        else:
+            entry.seconds = int(entry.old_second / speed)
+            entry.dur = seconds_to_min(entry.seconds)
+            entry.speed = speed
+        entry.played = int(source_pos / speed)
 
 
     @capture_internal_err
@@ -316,6 +310,7 @@ class Call:
                 f"ᴜɴᴀʙʟᴇ ᴛᴏ ᴊᴏɪɴ ᴛʜᴇ ɢʀᴏᴜᴘ ᴄᴀʟʟ.\nRᴇᴀsᴏɴ: {e}"
             )
         self.active_calls.add(chat_id)
+        self._follow(chat_id, link)
         await add_active_chat(chat_id)
         await music_on(chat_id)
         if video:
@@ -359,22 +354,17 @@ class Call:
             except:
                 return
         else:
-            queued = check[0]["file"]
+            prefetcher.refresh(chat_id)
+            queued = check[0].file
             language = await get_lang(chat_id)
             _ = get_string(language)
-            title = (check[0]["title"]).title()
-            user = check[0]["by"]
-            original_chat_id = check[0]["chat_id"]
-            streamtype = check[0]["streamtype"]
-            videoid = check[0]["vidid"]
-            db[chat_id][0]["played"] = 0
-
-            exis = (check[0]).get("old_dur")
-            if exis:
-                db[chat_id][0]["dur"] = exis
-                db[chat_id][0]["seconds"] = check[0]["old_second"]
-                db[chat_id][0]["speed_path"] = None
-                db[chat_id][0]["speed"] = 1.0
+            title = check[0].title.title()
+            user = check[0].by
+            original_chat_id = check[0].chat_id
+            streamtype = check[0].streamtype
+            videoid = check[0].vidid
+            check[0].played = 0
+            check[0].reset_speed()
 
             video = True if str(streamtype) == "video" else False
 
@@ -388,6 +378,7 @@ class Call:
                     await client.play(chat_id, stream)
                 except Exception:
                     return await send_message_to_topics(original_chat_id, text=_["call_6"])
+                self._follow(chat_id, link)
 
                 img = await get_thumb(videoid)
                 button = stream_markup(_, chat_id)
@@ -397,50 +388,51 @@ class Call:
                     caption=_["stream_1"].format(
                         f"https://t.me/{app.username}?start=info_{videoid}",
                         title[:23],
-                        check[0]["dur"],
+                        check[0].dur,
                         user,
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                progress_updater.announce(chat_id, run, "tg")
 
             elif "vid_" in queued:
-                mystic = await send_message_to_topics(original_chat_id, _["call_7"])
+                entry = check[0]
+                status = await send_message_to_topics(original_chat_id, _["call_7"])
                 try:
-                    file_path, direct = await YouTube.download(
-                        videoid,
-                        mystic,
-                        videoid=True,
-                        video=True if str(streamtype) == "video" else False,
-                    )
+                    with download_priority(Priority.PLAYING, chat_id):
+                        file_path, direct = await YouTube.download(
+                            videoid,
+                            status[0] if status else None,
+                            videoid=True,
+                            video=True if str(streamtype) == "video" else False,
+                        )
                 except:
-                    return await mystic.edit_text(
-                        _["call_6"], disable_web_page_preview=True
-                    )
+                    await delete_messages(status)
+                    return await send_message_to_topics(original_chat_id, text=_["call_6"])
+                entry.hold(file_path)
 
                 stream = dynamic_media_stream(path=file_path, video=video)
                 try:
                     await client.play(chat_id, stream)
                 except:
                     return await send_message_to_topics(original_chat_id, text=_["call_6"])
+                self._follow(chat_id, file_path)
 
                 img = await get_thumb(videoid)
                 button = stream_markup(_, chat_id)
-                await mystic.delete()
+                await delete_messages(status)
                 run = await send_photo_to_topics(
                     chat_id=original_chat_id,
                     photo=img,
                     caption=_["stream_1"].format(
                         f"https://t.me/{app.username}?start=info_{videoid}",
                         title[:23],
-                        check[0]["dur"],
+                        check[0].dur,
                         user,
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                progress_updater.announce(chat_id, run, "stream")
 
             elif "index_" in queued:
                 stream = dynamic_media_stream(path=videoid, video=video)
@@ -448,6 +440,7 @@ class Call:
                     await client.play(chat_id, stream)
                 except:
                     return await send_message_to_topics(original_chat_id, text=_["call_6"])
+                self._follow(chat_id, videoid)
 
                 button = stream_markup(_, chat_id)
                 run = await send_photo_to_topics(
@@ -456,8 +449,7 @@ class Call:
                     caption=_["stream_2"].format(user),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                progress_updater.announce(chat_id, run, "tg")
 
             else:
                 stream = dynamic_media_stream(path=queued, video=video)
@@ -465,6 +457,7 @@ class Call:
                     await client.play(chat_id, stream)
                 except:
                     return await send_message_to_topics(original_chat_id, text=_["call_6"])
+                self._follow(chat_id, queued)
 
                 if videoid == "telegram":
                     button = stream_markup(_, chat_id)
@@ -476,12 +469,11 @@ class Call:
                             else config.TELEGRAM_VIDEO_URL
                         ),
                         caption=_["stream_1"].format(
-                            config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                            config.SUPPORT_CHAT, title[:23], check[0].dur, user
                         ),
                         reply_markup=InlineKeyboardMarkup(button),
                     )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "tg"
+                    progress_updater.announce(chat_id, run, "tg")
 
                 elif videoid == "soundcloud":
                     button = stream_markup(_, chat_id)
@@ -489,12 +481,11 @@ class Call:
                         chat_id=original_chat_id,
                         photo=config.SOUNCLOUD_IMG_URL,
                         caption=_["stream_1"].format(
-                            config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                            config.SUPPORT_CHAT, title[:23], check[0].dur, user
                         ),
                         reply_markup=InlineKeyboardMarkup(button),
                     )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "tg"
+                    progress_updater.announce(chat_id, run, "tg")
 
                 else:
                     img = await get_thumb(videoid)
@@ -506,7 +497,7 @@ class Call:
                             caption=_["stream_1"].format(
                                 f"https://t.me/{app.username}?start=info_{videoid}",
                                 title[:23],
-                                check[0]["dur"],
+                                check[0].dur,
                                 user,
                             ),
                             reply_markup=InlineKeyboardMarkup(button),
@@ -520,13 +511,12 @@ class Call:
                             caption=_["stream_1"].format(
                                 f"https://t.me/{app.username}?start=info_{videoid}",
                                 title[:23],
-                                check[0]["dur"],
+                                check[0].dur,
                                 user,
                             ),
                             reply_markup=InlineKeyboardMarkup(button),
                         )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "stream"
+                    progress_updater.announce(chat_id, run, "stream")
 
 
     async def start(self) -> None:
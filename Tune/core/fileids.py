@@ -0,0 +1,138 @@
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, FrozenSet, Optional, Tuple
+
+from pyrogram.types import Message
+
+import config
+from Tune.core.dir import CACHE_DIR
+from Tune.core.mongo import mongodb
+from Tune.logging import LOGGER
+
+fileiddb = mongodb.fileids
+
+_CACHE_DIR = os.path.realpath(CACHE_DIR)
+# now-playing cards rendered per video id, e.g. cache/<id>_v4.png
+_THUMB_RE = re.compile(r"^[\w-]{11}(?:_v\d+)?\.png$")
+
+
+def _config_assets() -> FrozenSet[str]:
+    """Every URL set in config (image and video assets, START_VIDS, ...)."""
+    urls = set()
+    for value in vars(config).values():
+        for item in value if isinstance(value, (list, tuple)) else (value,):
+            if isinstance(item, str) and item.startswith(("http://", "https://")):
+                urls.add(item)
+    return frozenset(urls)
+
+
+_ASSETS = _config_assets()
+
+
+def _source(media: Any) -> Optional[Tuple[str, str]]:
+    """
+    (key, version) of a media source that is sent again and again: a config
+    asset URL or a video thumbnail under CACHE_DIR. None for anything else,
+    including file_ids and one-off uploads such as /song exports.
+    """
+    if not isinstance(media, str):
+        return None
+    if media.startswith(("http://", "https://")):
+        return (media, "") if media in _ASSETS else None
+    path = os.path.realpath(media)
+    if os.path.dirname(path) != _CACHE_DIR or not _THUMB_RE.match(os.path.basename(path)):
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    # thumbnails are re-rendered in place, so the version follows the content
+    return path, f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _file_id(message: Message) -> Optional[str]:
+    if not isinstance(message, Message):
+        return None
+    if message.photo:
+        return message.photo.file_id
+    media = message.video or message.animation or message.audio or message.document
+    return media.file_id if media else None
+
+
+class FileIdRegistry:
+    """
+    Remembers the ``file_id`` Telegram returned for the first upload of a
+    stable asset (see ``_source``), so later sends reuse it instead of uploading
+    or fetching again. Entries are stored in Mongo and dropped when the file
+    changes; sources known to have no entry are kept in memory so they do not
+    cost a Mongo round-trip on every send.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._ids: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._misses: "OrderedDict[str, None]" = OrderedDict()
+
+    def _remember_local(self, key: str, version: str, file_id: str) -> None:
+        self._misses.pop(key, None)
+        self._ids[key] = (version, file_id)
+        self._ids.move_to_end(key)
+        while len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+
+    def _miss(self, key: str) -> None:
+        self._misses[key] = None
+        self._misses.move_to_end(key)
+        while len(self._misses) > self.maxsize:
+            self._misses.popitem(last=False)
+
+    async def lookup(self, media: Any) -> Any:
+        """The file_id to send instead of ``media``, or ``media`` itself."""
+        source = _source(media)
+        if not source:
+            return media
+        key, version = source
+        if key in self._misses:
+            self._misses.move_to_end(key)
+            return media
+        entry = self._ids.get(key)
+        if entry is None:
+            doc = await fileiddb.find_one({"_id": key})
+            if not doc:
+                self._miss(key)
+                return media
+            entry = (doc.get("version", ""), doc["file_id"])
+            self._remember_local(key, *entry)
+        if entry[0] != version:
+            await self.forget(media)
+            return media
+        return entry[1]
+
+    async def remember(self, media: Any, message: Message) -> None:
+        source = _source(media)
+        file_id = _file_id(message)
+        if not source or not file_id:
+            return
+        key, version = source
+        self._remember_local(key, version, file_id)
+        try:
+            await fileiddb.update_one(
+                {"_id": key},
+                {"$set": {"file_id": file_id, "version": version, "ts": time.time()}},
+                upsert=True,
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not persist file_id for {key}: {e}")
+
+    async def forget(self, media: Any) -> None:
+        source = _source(media)
+        if not source:
+            return
+        self._ids.pop(source[0], None)
+        self._miss(source[0])
+        await fileiddb.delete_one({"_id": source[0]})
+
+
+file_ids = FileIdRegistry()
@@ -3,7 +3,8 @@ from typing import List, Union, Optional
 
 import aiohttp
 from bs4 import BeautifulSoup
-from youtubesearchpython.__future__ import VideosSearch
+
+from Tune.utils.metacache import youtube_search
 
 
 class AppleAPI:
@@ -34,12 +35,11 @@ class AppleAPI:
         if not title_query:
             return False
 
-        results = VideosSearch(title_query, limit=1)
-        data = await results.next()
-        if not data.get("result"):
+        results = await youtube_search(title_query)
+        if not results:
             return False
 
-        r = data["result"][0]
+        r = results[0]
         track_details = {
             "title": r.get("title", ""),
             "link": r.get("link", ""),
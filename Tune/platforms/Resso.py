@@ -3,7 +3,8 @@ from typing import Union
 
 import aiohttp
 from bs4 import BeautifulSoup
-from youtubesearchpython.__future__ import VideosSearch
+
+from Tune.utils.metacache import youtube_search
 
 
 class RessoAPI:
@@ -37,8 +38,7 @@ class RessoAPI:
                     pass
         if des == "":
             return
-        results = VideosSearch(title, limit=1)
-        for result in (await results.next())["result"]:
+        for result in await youtube_search(title):
             title = result["title"]
             ytlink = result["link"]
             vidid = result["id"]
@@ -1,11 +1,9 @@
-import asyncio
 import re
 from typing import Any, Dict, Optional, Tuple, Union
 
-from yt_dlp import YoutubeDL
-
 from Tune.utils.downloader import download_audio_concurrent
 from Tune.utils.formatters import seconds_to_min
+from Tune.utils.ytinfo import get_extraction
 
 
 _SC_RE = re.compile(r"^https?://(soundcloud\.com|on\.soundcloud\.com)/.+", re.I)
@@ -15,23 +13,9 @@ class SoundAPI:
     async def valid(self, link: str) -> bool:
         return bool(link and _SC_RE.match(link))
 
-    async def _extract_info(self, url: str) -> Dict[str, Any]:
-        def _run():
-            opts = {
-                "quiet": True,
-                "no_warnings": True,
-                "noplaylist": True,
-                "skip_download": True,
-            }
-            with YoutubeDL(opts) as ydl:
-                return ydl.extract_info(url, download=False)
-
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, _run)
-
     async def download(self, url: str) -> Union[Tuple[Dict[str, Any], str], bool]:
         try:
-            info = await self._extract_info(url)
+            info = (await get_extraction(url)).info
         except Exception:
             return False
 
@@ -2,9 +2,8 @@ import re
 
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
-from youtubesearchpython.__future__ import VideosSearch
-
 import config
+from Tune.utils.metacache import youtube_search
 
 
 class SpotifyAPI:
@@ -34,9 +33,7 @@ class SpotifyAPI:
             fetched = f' {artist["name"]}'
             if "Various Artists" not in fetched:
                 info += fetched
-        results = VideosSearch(info, limit=1)
-        data = await results.next()
-        r = data["result"][0]
+        r = (await youtube_search(info))[0]
         track_details = {
             "title": r["title"],
             "link": r["link"],
@@ -8,11 +8,11 @@ from pyrogram.errors import FloodWait, MessageNotModified
 import config
 from Tune import app
 from Tune.utils.formatters import (
-    check_duration,
     convert_bytes,
     get_readable_time,
     seconds_to_min,
 )
+from Tune.utils.mediainfo import media_info
 
 class TeleAPI:
     def __init__(self):
@@ -71,11 +71,9 @@ class TeleAPI:
             pass
         if file_path:
             try:
-                # Use asyncio for non-blocking duration check
-                dur = await asyncio.get_event_loop().run_in_executor(
-                    None, check_duration, file_path
-                )
-                return seconds_to_min(dur)
+                dur = await media_info.duration(file_path)
+                if dur:
+                    return seconds_to_min(dur)
             except Exception:
                 pass
         return "Unknown"
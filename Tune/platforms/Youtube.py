@@ -1,121 +1,29 @@
-import asyncio
-import contextlib
-import json
-import os
 import re
-import time
 from typing import Dict, List, Optional, Tuple, Union
 
-import yt_dlp
 from pyrogram.enums import MessageEntityType
 from pyrogram.types import Message
 from youtubesearchpython.__future__ import VideosSearch
 
-from Tune.utils.cookie_handler import COOKIE_PATH
 from Tune.utils.database import is_on_off
-from Tune.utils.downloader import download_audio_concurrent, yt_dlp_download
+from Tune.utils.downloader import (
+    download_audio_concurrent,
+    progressive_audio,
+    yt_dlp_download,
+)
 from Tune.utils.errors import capture_internal_err
 from Tune.utils.formatters import time_to_seconds
+from Tune.utils.mediacache import source_key
+from Tune.utils.metacache import MetaCache, youtube_search
 from Tune.utils.tuning import (
-    YTDLP_TIMEOUT,
+    PROGRESSIVE_STREAM,
     YOUTUBE_META_MAX,
     YOUTUBE_META_TTL,
 )
+from Tune.utils.ytdlpool import ytdlp_pool
+from Tune.utils.ytinfo import get_extraction, stream_urls
 
-_cache: Dict[str, Tuple[float, List[Dict]]] = {}
-_cache_lock = asyncio.Lock()
-_formats_cache: Dict[str, Tuple[float, List[Dict], str]] = {}
-_formats_lock = asyncio.Lock()
-
-
-def _cookiefile_path() -> Optional[str]:
-    path = str(COOKIE_PATH)
-    try:
-        if path and os.path.exists(path) and os.path.getsize(path) > 0:
-            return path
-    except Exception:
-        pass
-    return None
-
-
-def _cookies_args() -> List[str]:
-    p = _cookiefile_path()
-    return ["--cookies", p] if p else []
-
-
-def _get_optimized_yt_dlp_opts(cookiefile_path: Optional[str] = None, download_type: str = "info") -> Dict:
-    """Get optimized yt-dlp options for faster downloads and better quality"""
-    opts = {
-        'quiet': True,
-        'no_warnings': True,
-        'outtmpl': '%(title)s.%(ext)s',
-        'retries': 3,
-        'fragment_retries': 5,
-        'skip_unavailable_fragments': True,
-        'keep_fragments': False,
-        'concurrent_fragment_downloads': 4,  # Download fragments concurrently
-        'http_chunk_size': 1048576,  # 1MB chunks for better speed
-        'buffer_size': 16384,  # 16KB buffer
-    }
-    
-    # Only set audio extraction options when actually downloading audio
-    if download_type == "audio":
-        opts['extractaudio'] = True
-        opts['audioformat'] = 'best'
-    elif download_type == "info":
-        # For info extraction only, don't set audio extraction options
-        pass
-    
-    if cookiefile_path:
-        opts['cookiefile'] = cookiefile_path
-    
-    return opts
-
-
-async def _exec_proc(*args: str) -> Tuple[bytes, bytes]:
-    # Add concurrent connection args for faster downloads
-    enhanced_args = list(args)
-    if 'yt-dlp' in enhanced_args:
-        # Add performance optimization flags
-        perf_flags = [
-            '--concurrent-fragments', '4',
-            '--retries', '3',
-            '--fragment-retries', '5',
-        ]
-        enhanced_args.extend(perf_flags)
-    
-    proc = await asyncio.create_subprocess_exec(
-        *enhanced_args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-    )
-    try:
-        return await asyncio.wait_for(proc.communicate(), timeout=YTDLP_TIMEOUT)
-    except asyncio.TimeoutError:
-        with contextlib.suppress(Exception):
-            proc.kill()
-        return b"", b"timeout"
-
-
-@capture_internal_err
-async def cached_youtube_search(query: str) -> List[Dict]:
-    key = f"q:{query}"
-    now = time.time()
-    async with _cache_lock:
-        if key in _cache:
-            ts, val = _cache[key]
-            if now - ts < YOUTUBE_META_TTL:
-                return val
-            _cache.pop(key, None)
-        if len(_cache) > YOUTUBE_META_MAX:
-            _cache.clear()
-    try:
-        data = await VideosSearch(query, limit=1).next()
-        result = data.get("result", [])
-    except Exception:
-        result = []
-    if result:
-        async with _cache_lock:
-            _cache[key] = (now, result)
-    return result
+_formats_cache = MetaCache(YOUTUBE_META_MAX, YOUTUBE_META_TTL)
 
 
 class YouTubeAPI:
@@ -168,8 +76,8 @@ class YouTubeAPI:
         self, query: str, *, use_cache: bool = True
     ) -> Optional[Dict]:
         q = self._prepare_link(query)
-        if use_cache and not q.startswith("http"):
-            res = await cached_youtube_search(q)
+        if use_cache:
+            res = await youtube_search(q)
             return res[0] if res else None
         data = await VideosSearch(q, limit=1).next()
         result = data.get("result", [])
@@ -177,17 +85,11 @@ class YouTubeAPI:
 
     @capture_internal_err
     async def is_live(self, link: str) -> bool:
-        prepared = self._prepare_link(link)
-        stdout, _ = await _exec_proc(
-            "yt-dlp", *(_cookies_args()), "--dump-json", prepared
-        )
-        if not stdout:
-            return False
         try:
-            info = json.loads(stdout.decode())
-            return bool(info.get("is_live"))
-        except json.JSONDecodeError:
+            extraction = await get_extraction(self._prepare_link(link))
+        except Exception:
             return False
+        return extraction.is_live
 
     @capture_internal_err
     async def details(
@@ -232,18 +134,22 @@ class YouTubeAPI:
     async def video(
         self, link: str, videoid: Union[str, bool, None] = None, quality: str = "1080p"
     ) -> Tuple[int, str]:
+        if videoid is True and not self._url_pattern.search(link):
+            # called with a bare video id
+            link = self.base_url + link
         link = self._prepare_link(link, videoid)
-        format_selector = self.video_formats.get(quality, self.video_formats['1080p'])
-        
-        stdout, stderr = await _exec_proc(
-            "yt-dlp",
-            *(_cookies_args()),
-            "-g",
-            "-f",
-            format_selector,
-            link,
-        )
-        return (1, stdout.decode().split("\n")[0]) if stdout else (0, stderr.decode())
+        if quality not in self.video_formats:
+            quality = "1080p"
+
+        async def resolve() -> Optional[str]:
+            extraction = await get_extraction(link)
+            return await extraction.stream_url(self.video_formats[quality])
+
+        try:
+            url = await stream_urls.get(source_key(link), quality, resolve)
+        except Exception as e:
+            return 0, str(e)
+        return (1, url) if url else (0, "No playable format found")
 
     @capture_internal_err
     async def playlist(
@@ -252,19 +158,10 @@ class YouTubeAPI:
         if videoid:
             link = self.playlist_url + str(videoid)
         link = link.split("&")[0]
-        stdout, _ = await _exec_proc(
-            "yt-dlp",
-            *(_cookies_args()),
-            "-i",
-            "--get-id",
-            "--flat-playlist",
-            "--playlist-end",
-            str(limit),
-            "--skip-download",
-            link,
-        )
-        items = stdout.decode().strip().split("\n") if stdout else []
-        return [i for i in items if i]
+        try:
+            return await ytdlp_pool.playlist_ids(link, limit, {"ignoreerrors": True})
+        except Exception:
+            return []
 
     @capture_internal_err
     async def track(
@@ -276,12 +173,10 @@ class YouTubeAPI:
                 raise ValueError("Track not found via API")
         except Exception:
             prepared = self._prepare_link(link, videoid)
-            stdout, _ = await _exec_proc(
-                "yt-dlp", *(_cookies_args()), "--dump-json", prepared
-            )
-            if not stdout:
-                raise ValueError("Track not found (yt-dlp fallback)")
-            info = json.loads(stdout.decode())
+            try:
+                info = (await get_extraction(prepared)).info
+            except Exception as e:
+                raise ValueError("Track not found (yt-dlp fallback)") from e
         thumb = (
             info.get("thumbnail")
             or info.get("thumbnails", [{}])[0].get("url", "")
@@ -302,49 +197,44 @@ class YouTubeAPI:
         self, link: str, videoid: Union[str, bool, None] = None
     ) -> Tuple[List[Dict], str]:
         link = self._prepare_link(link, videoid)
-        key = f"f:{link}"
-        now = time.time()
-        async with _formats_lock:
-            cached = _formats_cache.get(key)
-            if cached and now - cached[0] < YOUTUBE_META_TTL:
-                return cached[1], cached[2]
+        out = await _formats_cache.get(link, lambda: self._load_formats(link))
+        return out, link
 
-        opts = _get_optimized_yt_dlp_opts(_cookiefile_path(), "info")
+    async def _load_formats(self, link: str) -> List[Dict]:
         out: List[Dict] = []
         try:
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                info = ydl.extract_info(link, download=False)
-                for fmt in info.get("formats", []):
-                    if "dash" in str(fmt.get("format", "")).lower():
-                        continue
-                    # Filter for good quality formats (prioritize 1080p and below)
-                    height = fmt.get("height", 0)
-                    if height and height > 1080:
-                        continue
-                        
-                    if not any(k in fmt for k in ("filesize", "filesize_approx")):
-                        continue
-                    if not all(k in fmt for k in ("format", "format_id", "ext", "format_note")):
-                        continue
-                    size = fmt.get("filesize") or fmt.get("filesize_approx")
-                    if not size:
-                        continue
-                        
-                    # Add quality info for better selection
-                    format_data = {
-                        "format": fmt["format"],
-                        "filesize": size,
-                        "format_id": fmt["format_id"],
-                        "ext": fmt["ext"],
-                        "format_note": fmt["format_note"],
-                        "yturl": link,
-                        "height": height,
-                        "width": fmt.get("width", 0),
-                        "fps": fmt.get("fps", 0),
-                        "vcodec": fmt.get("vcodec", ""),
-                        "acodec": fmt.get("acodec", ""),
-                    }
-                    out.append(format_data)
+            info = (await get_extraction(link)).info
+            for fmt in info.get("formats", []):
+                if "dash" in str(fmt.get("format", "")).lower():
+                    continue
+                # Filter for good quality formats (prioritize 1080p and below)
+                height = fmt.get("height", 0)
+                if height and height > 1080:
+                    continue
+                    
+                if not any(k in fmt for k in ("filesize", "filesize_approx")):
+                    continue
+                if not all(k in fmt for k in ("format", "format_id", "ext", "format_note")):
+                    continue
+                size = fmt.get("filesize") or fmt.get("filesize_approx")
+                if not size:
+                    continue
+                    
+                # Add quality info for better selection
+                format_data = {
+                    "format": fmt["format"],
+                    "filesize": size,
+                    "format_id": fmt["format_id"],
+                    "ext": fmt["ext"],
+                    "format_note": fmt["format_note"],
+                    "yturl": link,
+                    "height": height,
+                    "width": fmt.get("width", 0),
+                    "fps": fmt.get("fps", 0),
+                    "vcodec": fmt.get("vcodec", ""),
+                    "acodec": fmt.get("acodec", ""),
+                }
+                out.append(format_data)
         except Exception:
             pass
 
@@ -354,13 +244,7 @@ class YouTubeAPI:
             -x.get("fps", 0),     # Higher fps first
             -x.get("filesize", 0) # Larger file (better quality) first
         ))
-
-        async with _formats_lock:
-            if len(_formats_cache) > YOUTUBE_META_MAX:
-                _formats_cache.clear()
-            _formats_cache[key] = (now, out, link)
-
-        return out, link
+        return out
 
     @capture_internal_err
     async def slider(
@@ -392,7 +276,8 @@ class YouTubeAPI:
         songvideo: Union[bool, str, None] = None,
         format_id: Union[bool, str, None] = None,
         title: Union[bool, str, None] = None,
-        quality: str = "1080p"
+        quality: str = "1080p",
+        progressive: Optional[bool] = None,
     ) -> Union[Tuple[str, Optional[bool]], Tuple[None, None]]:
         link = self._prepare_link(link, videoid)
 
@@ -415,13 +300,7 @@ class YouTubeAPI:
                     return stream_url, None
                 raise ValueError("Unable to fetch live stream link")
             if await is_on_off(1):
-                # Use optimized download with better quality settings
-                p = await yt_dlp_download(
-                    link, 
-                    type="video", 
-                    format_id=format_id,
-                    quality=quality
-                )
+                p = await yt_dlp_download(link, type="video", format_id=format_id)
                 return (p, True) if p else (None, None)
             
             # For streaming, get the best quality URL up to 1080p
@@ -430,5 +309,8 @@ class YouTubeAPI:
                 return stream_url, None
             return None, None
 
-        p = await download_audio_concurrent(link)
+        if PROGRESSIVE_STREAM if progressive is None else progressive:
+            p = await progressive_audio(link)
+        else:
+            p = await download_audio_concurrent(link)
         return (p, True) if p else (None, None)
@@ -1,5 +1,4 @@
 import asyncio
-import random
 
 from pyrogram import filters
 from pyrogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
@@ -16,14 +15,11 @@ from config import (
     confirmer,
     votemode,
 )
-from strings import get_string
 from Tune import YouTube, app
 from Tune.core.call import JARVIS
 from Tune.misc import SUDOERS, db
 from Tune.utils.database import (
-    get_active_chats,
     get_assistant,
-    get_lang,
     get_upvote_count,
     is_active_chat,
     is_music_playing,
@@ -35,14 +31,16 @@ from Tune.utils.database import (
     mute_on,
     set_loop,
 )
+from Tune.utils.dlqueue import Priority, download_priority
 from Tune.utils.decorators import ActualAdminCB, languageCB
 from Tune.utils.formatters import seconds_to_min
-from Tune.utils.inline import close_markup, stream_markup, stream_markup_timer
+from Tune.utils.inline import close_markup, stream_markup
+from Tune.utils.prefetch import prefetcher
+from Tune.utils.progress import progress_updater
 from Tune.utils.stream.autoclear import auto_clean
 from Tune.utils.thumbnails import get_thumb
 
 
-checker = {}
 upvoters = {}
 
 
@@ -77,7 +75,7 @@ async def handle_upvote(callback: CallbackQuery, chat_id: int, counter, _):
         except Exception:
             return await callback.edit_message_text("ғᴀɪʟᴇᴅ.")
         try:
-            if current["vidid"] != stored["vidid"] or current["file"] != stored["file"]:
+            if current.vidid != stored["vidid"] or current.file != stored["file"]:
                 return await callback.edit_message_text(_["admin_35"])
         except Exception:
             return await callback.edit_message_text(_["admin_36"])
@@ -193,17 +191,11 @@ async def manage_callback(client, callback: CallbackQuery, _):
         playlist = db.get(chat_id)
         if not playlist:
             return await callback.answer(_["admin_42"], show_alert=True)
-        try:
-            popped = playlist.pop(0)
-        except Exception:
-            return await callback.answer(_["admin_43"], show_alert=True)
-
-        if not playlist:
-            playlist.insert(0, popped)
+        if len(playlist) < 3:
             return await callback.answer(_["admin_43"], show_alert=True)
         await callback.answer()
-        random.shuffle(playlist)
-        playlist.insert(0, popped)
+        playlist.shuffle_upcoming()
+        prefetcher.refresh(chat_id)
         await callback.message.reply_text(_["admin_44"].format(user_mention))
 
     elif command in ["Skip", "Replay"]:
@@ -249,21 +241,18 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
     if not playlist:
         return await callback.answer(_["queue_2"], show_alert=True)
 
+    prefetcher.refresh(chat_id)
     current_track = playlist[0]
-    queued = current_track["file"]
-    title = current_track["title"].title()
-    user = current_track["by"]
-    duration = current_track["dur"]
-    streamtype = current_track["streamtype"]
-    videoid = current_track["vidid"]
+    queued = current_track.file
+    title = current_track.title.title()
+    user = current_track.by
+    duration = current_track.dur
+    streamtype = current_track.streamtype
+    videoid = current_track.vidid
     status = True if str(streamtype) == "video" else None
 
-    db[chat_id][0]["played"] = 0
-    if current_track.get("old_dur"):
-        db[chat_id][0]["dur"] = current_track["old_dur"]
-        db[chat_id][0]["seconds"] = current_track["old_second"]
-        db[chat_id][0]["speed_path"] = None
-        db[chat_id][0]["speed"] = 1.0
+    current_track.played = 0
+    current_track.reset_speed()
 
     if "live_" in queued:
         n, new_link = await YouTube.video(videoid, True)
@@ -287,16 +276,17 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
             caption=_["stream_1"].format(f"https://t.me/{app.username}?start=info_{videoid}", title[:23], duration, user),
             reply_markup=InlineKeyboardMarkup(buttons)
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        progress_updater.announce(chat_id, [run], "tg")
         await callback.edit_message_text(text_msg, reply_markup=close_markup(_))
 
     elif "vid_" in queued:
         mystic = await callback.message.reply_text(_["call_7"], disable_web_page_preview=True)
         try:
-            file_path, direct = await YouTube.download(videoid, mystic, videoid=True, video=status)
+            with download_priority(Priority.PLAYING, chat_id):
+                file_path, direct = await YouTube.download(videoid, mystic, videoid=True, video=status)
         except Exception:
             return await mystic.edit_text(_["call_6"])
+        current_track.hold(file_path)
         try:
             image = await YouTube.thumbnail(videoid, True)
         except Exception:
@@ -312,8 +302,7 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
             caption=_["stream_1"].format(f"https://t.me/{app.username}?start=info_{videoid}", title[:23], duration, user),
             reply_markup=InlineKeyboardMarkup(buttons)
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "stream"
+        progress_updater.announce(chat_id, [run], "stream")
         await callback.edit_message_text(text_msg, reply_markup=close_markup(_))
         await mystic.delete()
 
@@ -328,8 +317,7 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
             caption=_["stream_2"].format(user),
             reply_markup=InlineKeyboardMarkup(buttons)
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        progress_updater.announce(chat_id, [run], "tg")
         await callback.edit_message_text(text_msg, reply_markup=close_markup(_))
 
     else:
@@ -351,8 +339,7 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
                 caption=_["stream_1"].format(SUPPORT_CHAT, title[:23], duration, user),
                 reply_markup=InlineKeyboardMarkup(buttons)
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            progress_updater.announce(chat_id, [run], "tg")
         elif videoid == "soundcloud":
             buttons = stream_markup(_, chat_id)
             run = await callback.message.reply_photo(
@@ -360,8 +347,7 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
                 caption=_["stream_1"].format(SUPPORT_CHAT, title[:23], duration, user),
                 reply_markup=InlineKeyboardMarkup(buttons)
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            progress_updater.announce(chat_id, [run], "tg")
         else:
             buttons = stream_markup(_, chat_id)
             img = await get_thumb(videoid)
@@ -370,8 +356,7 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
                 caption=_["stream_1"].format(f"https://t.me/{app.username}?start=info_{videoid}", title[:23], duration, user),
                 reply_markup=InlineKeyboardMarkup(buttons)
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            progress_updater.announce(chat_id, [run], "stream")
         await callback.edit_message_text(text_msg, reply_markup=close_markup(_))
 
 
@@ -379,15 +364,15 @@ async def handle_seek(callback: CallbackQuery, _, chat_id: int, command: str, us
     playing = db.get(chat_id)
     if not playing:
         return await callback.answer(_["queue_2"], show_alert=True)
-    duration_seconds = int(playing[0]["seconds"])
+    duration_seconds = int(playing[0].seconds)
     if duration_seconds == 0:
         return await callback.answer(_["admin_22"], show_alert=True)
-    file_path = playing[0]["file"]
+    file_path = playing[0].file
     if "index_" in file_path or "live_" in file_path:
         return await callback.answer(_["admin_22"], show_alert=True)
-    duration_played = int(playing[0]["played"])
+    duration_played = int(playing[0].played)
     duration_to_skip = 10 if int(command) in [1, 2] else 30
-    duration = playing[0]["dur"]
+    duration = playing[0].dur
     if int(command) in [1, 3]:
         if (duration_played - duration_to_skip) <= 10:
             bet = seconds_to_min(duration_played)
@@ -410,7 +395,7 @@ async def handle_seek(callback: CallbackQuery, _, chat_id: int, command: str, us
     await callback.answer()
     mystic = await callback.message.reply_text(_["admin_24"])
     if "vid_" in file_path:
-        n, file_path = await YouTube.video(playing[0]["vidid"], True)
+        n, file_path = await YouTube.video(playing[0].vidid, True)
         if n == 0:
             return await mystic.edit_text(_["admin_22"])
     try:
@@ -419,59 +404,19 @@ async def handle_seek(callback: CallbackQuery, _, chat_id: int, command: str, us
             file_path,
             seconds_to_min(to_seek),
             duration,
-            playing[0]["streamtype"],
+            playing[0].streamtype,
+            playing[0].speed,
         )
     except Exception:
         return await mystic.edit_text(_["admin_26"])
     if int(command) in [1, 3]:
-        db[chat_id][0]["played"] -= duration_to_skip
+        db[chat_id][0].played -= duration_to_skip
     else:
-        db[chat_id][0]["played"] += duration_to_skip
+        db[chat_id][0].played += duration_to_skip
     seek_message = _["admin_25"].format(seconds_to_min(to_seek))
     await mystic.edit_text(f"{seek_message}\n\nᴄʜᴀɴɢᴇs ᴅᴏɴᴇ ʙʏ : {user_mention} !")
 
 
-async def markup_timer():
-    while True:
-        await asyncio.sleep(6)
-        active_chats = await get_active_chats()
-        for chat_id in active_chats:
-            try:
-                if not await is_music_playing(chat_id):
-                    continue
-                playing = db.get(chat_id)
-                if not playing:
-                    continue
-                duration_seconds = int(playing[0]["seconds"])
-                if duration_seconds == 0:
-                    continue
-                mystic = playing[0].get("mystic")
-                if not mystic:
-                    continue
-                if chat_id in checker and mystic.id in checker[chat_id]:
-                    if checker[chat_id][mystic.id] is False:
-                        continue
-                try:
-                    language = await get_lang(chat_id)
-                    _lang = get_string(language)
-                except Exception:
-                    _lang = get_string("en")
-                try:
-                    buttons = stream_markup_timer(
-                        _lang,
-                        chat_id,
-                        seconds_to_min(playing[0]["played"]),
-                        playing[0]["dur"],
-                    )
-                    await mystic.edit_reply_markup(reply_markup=InlineKeyboardMarkup(buttons))
-                except Exception:
-                    continue
-            except Exception:
-                continue
-
-asyncio.create_task(markup_timer())
-
-
 # ── Close Button Callback ──
 @app.on_callback_query(filters.regex("close") & ~BANNED_USERS)
 async def close_menu(_, query: CallbackQuery):
@@ -6,8 +6,11 @@ from Tune import YouTube, app
 from Tune.core.call import JARVIS
 from Tune.misc import db
 from Tune.utils.database import get_loop
+from Tune.utils.dlqueue import Priority, download_priority
 from Tune.utils.decorators import AdminRightsCheck, TopicAccessCheck
 from Tune.utils.inline import close_markup, stream_markup
+from Tune.utils.prefetch import prefetcher
+from Tune.utils.progress import progress_updater
 from Tune.utils.stream.autoclear import auto_clean
 from Tune.utils.thumbnails import get_thumb
 from config import BANNED_USERS
@@ -90,19 +93,15 @@ async def skip(cli, message: Message, _, chat_id):
                 return await JARVIS.stop_stream(chat_id)
             except:
                 return
-    queued = check[0]["file"]
-    title = (check[0]["title"]).title()
-    user = check[0]["by"]
-    streamtype = check[0]["streamtype"]
-    videoid = check[0]["vidid"]
+    prefetcher.refresh(chat_id)
+    queued = check[0].file
+    title = check[0].title.title()
+    user = check[0].by
+    streamtype = check[0].streamtype
+    videoid = check[0].vidid
     status = True if str(streamtype) == "video" else None
-    db[chat_id][0]["played"] = 0
-    exis = (check[0]).get("old_dur")
-    if exis:
-        db[chat_id][0]["dur"] = exis
-        db[chat_id][0]["seconds"] = check[0]["old_second"]
-        db[chat_id][0]["speed_path"] = None
-        db[chat_id][0]["speed"] = 1.0
+    check[0].played = 0
+    check[0].reset_speed()
     if "live_" in queued:
         n, link = await YouTube.video(videoid, True)
         if n == 0:
@@ -122,24 +121,26 @@ async def skip(cli, message: Message, _, chat_id):
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
                 title[:23],
-                check[0]["dur"],
+                check[0].dur,
                 user,
             ),
             reply_markup=InlineKeyboardMarkup(button),
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        progress_updater.announce(chat_id, [run], "tg")
     elif "vid_" in queued:
+        entry = check[0]
         mystic = await message.reply_text(_["call_7"], disable_web_page_preview=True)
         try:
-            file_path, direct = await YouTube.download(
-                videoid,
-                mystic,
-                videoid=True,
-                video=status,
-            )
+            with download_priority(Priority.PLAYING, chat_id):
+                file_path, direct = await YouTube.download(
+                    videoid,
+                    mystic,
+                    videoid=True,
+                    video=status,
+                )
         except:
             return await mystic.edit_text(_["call_6"])
+        entry.hold(file_path)
         try:
             image = await YouTube.thumbnail(videoid, True)
         except:
@@ -155,13 +156,12 @@ async def skip(cli, message: Message, _, chat_id):
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
                 title[:23],
-                check[0]["dur"],
+                check[0].dur,
                 user,
             ),
             reply_markup=InlineKeyboardMarkup(button),
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "stream"
+        progress_updater.announce(chat_id, [run], "stream")
         await mystic.delete()
     elif "index_" in queued:
         try:
@@ -174,8 +174,7 @@ async def skip(cli, message: Message, _, chat_id):
             caption=_["stream_2"].format(user),
             reply_markup=InlineKeyboardMarkup(button),
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        progress_updater.announce(chat_id, [run], "tg")
     else:
         if videoid == "telegram":
             image = None
@@ -197,12 +196,11 @@ async def skip(cli, message: Message, _, chat_id):
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
                 caption=_["stream_1"].format(
-                    config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                    config.SUPPORT_CHAT, title[:23], check[0].dur, user
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            progress_updater.announce(chat_id, [run], "tg")
         elif videoid == "soundcloud":
             button = stream_markup(_, chat_id)
             run = await message.reply_photo(
@@ -210,12 +208,11 @@ async def skip(cli, message: Message, _, chat_id):
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
                 caption=_["stream_1"].format(
-                    config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                    config.SUPPORT_CHAT, title[:23], check[0].dur, user
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            progress_updater.announce(chat_id, [run], "tg")
         else:
             button = stream_markup(_, chat_id)
             img = await get_thumb(videoid)
@@ -224,10 +221,9 @@ async def skip(cli, message: Message, _, chat_id):
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
                     title[:23],
-                    check[0]["dur"],
+                    check[0].dur,
                     user,
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
\ No newline at end of file
+            progress_updater.announce(chat_id, [run], "stream")
\ No newline at end of file
@@ -4,7 +4,7 @@ from pyrogram import Client, filters, types
 from pyrogram.types import InlineKeyboardMarkup, Message
 
 from Tune import app
-from Tune.utils.database import get_lang, get_served_users, get_served_chats
+from Tune.utils.database import get_lang, get_served_users_count, get_served_chats_count
 from Tune.utils.decorators.language import LanguageStart, languageCB
 from Tune.utils.inline.help import help_keyboard, help_back_markup, private_help_panel
 from Tune.utils.inline.start import private_panel
@@ -63,8 +63,8 @@ async def helper_cb(client: Client, CallbackQuery: types.CallbackQuery, _):
 async def back_to_main_cb(client: Client, CallbackQuery: types.CallbackQuery, _):
     out = private_panel(_)
     UP, CPU, RAM, DISK = await bot_sys_stats()
-    served_users = len(await get_served_users())
-    served_chats = len(await get_served_chats())
+    served_users = await get_served_users_count()
+    served_chats = await get_served_chats_count()
     await CallbackQuery.edit_message_caption(
         _["start_2"].format(
             CallbackQuery.from_user.mention,
@@ -4,7 +4,6 @@ import time
 from pyrogram import filters
 from pyrogram.enums import ChatType
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
-from youtubesearchpython.__future__ import VideosSearch
 
 import config
 from config import BANNED_USERS, HELP_IMG_URL, START_VIDS, STICKERS
@@ -16,10 +15,10 @@ from Tune.utils import bot_sys_stats
 from Tune.utils.database import (
     add_served_chat,
     add_served_user,
-    blacklisted_chats,
+    is_blacklisted_chat,
     get_lang,
-    get_served_chats,
-    get_served_users,
+    get_served_chats_count,
+    get_served_users_count,
     is_banned_user,
     is_on_off,
 )
@@ -27,6 +26,7 @@ from Tune.utils.decorators.language import LanguageStart
 from Tune.utils.formatters import get_readable_time
 from Tune.utils.inline import private_panel, start_panel
 from Tune.utils.inline.help import help_keyboard
+from Tune.utils.metacache import youtube_search
 
 
 async def delete_sticker_after_delay(message, delay):
@@ -57,8 +57,7 @@ async def start_pm(client, message: Message, _):
             m = await message.reply_text("🔎")
             query = str(name).replace("info_", "", 1)
             query = f"https://www.youtube.com/watch?v={query}"
-            results = VideosSearch(query, limit=1)
-            for result in (await results.next())["result"]:
+            for result in await youtube_search(query):
                 title = result["title"]
                 duration = result["duration"]
                 views = result["viewCount"]["short"]
@@ -94,8 +93,8 @@ async def start_pm(client, message: Message, _):
         out = private_panel(_)
         sticker_message = await message.reply_sticker(sticker=random.choice(STICKERS))
         asyncio.create_task(delete_sticker_after_delay(sticker_message, 2))
-        served_chats = len(await get_served_chats())
-        served_users = len(await get_served_users())
+        served_chats = await get_served_chats_count()
+        served_users = await get_served_users_count()
         UP, CPU, RAM, DISK = await bot_sys_stats()
         await message.reply_video(
             random.choice(START_VIDS),
@@ -143,7 +142,7 @@ async def welcome(client, message: Message):
                 if len(config.ALLOWED_CHATS) > 0 and message.chat.id not in config.ALLOWED_CHATS:
                     await message.reply_text(_["start_7"])
                     return await app.leave_chat(message.chat.id)
-                if message.chat.id in await blacklisted_chats():
+                if await is_blacklisted_chat(message.chat.id):
                     await message.reply_text(
                         _["start_5"].format(
                             app.mention,
@@ -1,4 +1,3 @@
-import asyncio
 from datetime import datetime
 
 from pyrogram.enums import ChatType
@@ -7,68 +6,66 @@ import config
 from Tune import app
 from Tune.core.call import JARVIS, autoend
 from Tune.utils.database import get_client, is_active_chat, is_autoend
+from Tune.utils.scheduler import scheduler
 
 
 async def auto_leave():
-    if config.AUTO_LEAVING_ASSISTANT:
-        while not await asyncio.sleep(config.AUTO_LEAVE_ASSISTANT_TIME):
-            from Tune.core.userbot import assistants
+    from Tune.core.userbot import assistants
 
-            for num in assistants:
-                client = await get_client(num)
-                left = 0
-                try:
-                    async for i in client.get_dialogs():
-                        if i.chat.type in [
-                            ChatType.SUPERGROUP,
-                            ChatType.GROUP,
-                            ChatType.CHANNEL,
-                        ]:
-                            if (
-                                i.chat.id != config.LOGGER_ID
-                                and i.chat.id != -1002077986660
-                                and i.chat.id != -1002166290494
-                            ):
-                                if left == 20:
-                                    continue
-                                if not await is_active_chat(i.chat.id):
-                                    try:
-                                        await client.leave_chat(i.chat.id)
-                                        left += 1
-                                    except:
-                                        continue
-                except:
-                    pass
+    for num in assistants:
+        client = await get_client(num)
+        left = 0
+        try:
+            async for i in client.get_dialogs():
+                if i.chat.type in [
+                    ChatType.SUPERGROUP,
+                    ChatType.GROUP,
+                    ChatType.CHANNEL,
+                ]:
+                    if (
+                        i.chat.id != config.LOGGER_ID
+                        and i.chat.id != -1002077986660
+                        and i.chat.id != -1002166290494
+                    ):
+                        if left == 20:
+                            continue
+                        # checked live: a chat may have started playing since the snapshot
+                        if not await is_active_chat(i.chat.id):
+                            try:
+                                await client.leave_chat(i.chat.id)
+                                left += 1
+                            except:
+                                continue
+        except:
+            pass
 
 
-asyncio.create_task(auto_leave())
+if config.AUTO_LEAVING_ASSISTANT:
+    scheduler.add("auto_leave", auto_leave, config.AUTO_LEAVE_ASSISTANT_TIME)
 
 
+@scheduler.every(5)
 async def auto_end():
-    while not await asyncio.sleep(5):
-        ender = await is_autoend()
-        if not ender:
+    ender = await is_autoend()
+    if not ender:
+        return
+    for chat_id in autoend:
+        timer = autoend.get(chat_id)
+        if not timer:
             continue
-        for chat_id in autoend:
-            timer = autoend.get(chat_id)
-            if not timer:
-                continue
-            if datetime.now() > timer:
-                if not await is_active_chat(chat_id):
-                    autoend[chat_id] = {}
-                    continue
+        if datetime.now() > timer:
+            if chat_id not in scheduler.active_chats:
                 autoend[chat_id] = {}
-                try:
-                    await JARVIS.stop_stream(chat_id)
-                except:
-                    continue
-                try:
-                    await app.send_message(
-                        chat_id,
-                        "» ʙᴏᴛ ᴀᴜᴛᴏᴍᴀᴛɪᴄᴀʟʟʏ ʟᴇғᴛ ᴠɪᴅᴇᴏᴄʜᴀᴛ ʙᴇᴄᴀᴜsᴇ ɴᴏ ᴏɴᴇ ᴡᴀs ʟɪsᴛᴇɴɪɴɢ ᴏɴ ᴠɪᴅᴇᴏᴄʜᴀᴛ.",
-                    )
-                except:
-                    continue
-
-
-asyncio.create_task(auto_end())
+                continue
+            autoend[chat_id] = {}
+            try:
+                await JARVIS.stop_stream(chat_id)
+            except:
+                continue
+            try:
+                await app.send_message(
+                    chat_id,
+                    "» ʙᴏᴛ ᴀᴜᴛᴏᴍᴀᴛɪᴄᴀʟʟʏ ʟᴇғᴛ ᴠɪᴅᴇᴏᴄʜᴀᴛ ʙᴇᴄᴀᴜsᴇ ɴᴏ ᴏɴᴇ ᴡᴀs ʟɪsᴛᴇɴɪɴɢ ᴏɴ ᴠɪᴅᴇᴏᴄʜᴀᴛ.",
+                )
+            except:
+                continue
@@ -1,169 +1,176 @@
-import asyncio
+import contextlib
 
 from pyrogram import filters
 from pyrogram.enums import ChatMembersFilter
-from pyrogram.errors import FloodWait
 
 from Tune import app
 from Tune.misc import SUDOERS
 from Tune.utils.database import (
-    get_active_chats,
     get_authuser_names,
     get_client,
-    get_served_chats,
-    get_served_users,
+    get_served_chat_ids,
+    get_served_user_ids,
+)
+from Tune.utils.broadcast import (
+    BroadcastStage,
+    create_job,
+    finish_job,
+    unfinished_job,
 )
 from Tune.utils.decorators.language import language
-from Tune.utils.formatters import alpha_to_int
+from Tune.utils.formatters import alpha_to_int, get_readable_time
+from Tune.utils.scheduler import scheduler
+from Tune.utils.tuning import ASSISTANT_BROADCAST_RATE
 from config import adminlist
 
 IS_BROADCASTING = False
 
+_FLAGS = ("-pinloud", "-pin", "-nobot", "-assistant", "-user", "-resume")
+
+
+def _sender(client, payload, pin: bool = False):
+    async def send(stage, chat_id):
+        if payload.get("message_id"):
+            m = await client.forward_messages(
+                chat_id, payload["from_chat"], payload["message_id"]
+            )
+        else:
+            m = await client.send_message(chat_id, text=payload["text"])
+        if pin and (payload.get("pin") or payload.get("pinloud")):
+            with contextlib.suppress(Exception):
+                await m.pin(disable_notification=not payload.get("pinloud"))
+                stage.pins += 1
+        return True
+
+    return send
+
+
+async def _run_stage(job_id, name, targets, send, job_state, status, _, **limits):
+    state = (job_state or {}).get(name)
+    if state and state.get("done"):
+        return BroadcastStage(job_id, name, [], send, state)
+    stage = BroadcastStage(job_id, name, targets, send, state, **limits)
+
+    async def progress(s):
+        await status.edit_text(
+            _["broad_9"].format(
+                name,
+                s.sent,
+                s.failed,
+                s.total,
+                round(s.bucket.rate, 1),
+                get_readable_time(s.eta) or "0s",
+            )
+        )
+
+    return await stage.run(progress)
+
 
 @app.on_message(filters.command("broadcast") & SUDOERS)
 @language
 async def braodcast_message(client, message, _):
     global IS_BROADCASTING
-    if message.reply_to_message:
-        x = message.reply_to_message.id
-        y = message.chat.id
+    if IS_BROADCASTING:
+        return await message.reply_text(_["broad_10"])
+
+    if "-resume" in message.text:
+        job = await unfinished_job()
+        if not job:
+            return await message.reply_text(_["broad_11"])
+        job_id, payload, job_state = job["_id"], job["payload"], job.get("stages")
     else:
-        if len(message.command) < 2:
-            return await message.reply_text(_["broad_2"])
-        query = message.text.split(None, 1)[1]
-        if "-pin" in query:
-            query = query.replace("-pin", "")
-        if "-nobot" in query:
-            query = query.replace("-nobot", "")
-        if "-pinloud" in query:
-            query = query.replace("-pinloud", "")
-        if "-assistant" in query:
-            query = query.replace("-assistant", "")
-        if "-user" in query:
-            query = query.replace("-user", "")
-        if query == "":
-            return await message.reply_text(_["broad_8"])
+        if message.reply_to_message:
+            payload = {
+                "from_chat": message.chat.id,
+                "message_id": message.reply_to_message.id,
+            }
+        else:
+            if len(message.command) < 2:
+                return await message.reply_text(_["broad_2"])
+            query = message.text.split(None, 1)[1]
+            for flag in _FLAGS:
+                query = query.replace(flag, "")
+            query = query.strip()
+            if query == "":
+                return await message.reply_text(_["broad_8"])
+            payload = {"text": query}
+        payload.update(
+            pinloud="-pinloud" in message.text,
+            pin="-pin" in message.text.replace("-pinloud", ""),
+            bot="-nobot" not in message.text,
+            user="-user" in message.text,
+            assistant="-assistant" in message.text,
+        )
+        job_id, job_state = await create_job(payload), None
 
     IS_BROADCASTING = True
-    await message.reply_text(_["broad_1"])
-
-    if "-nobot" not in message.text:
-        sent = 0
-        pin = 0
-        chats = []
-        schats = await get_served_chats()
-        for chat in schats:
-            chats.append(int(chat["chat_id"]))
-        for i in chats:
-            try:
-                m = (
-                    await app.forward_messages(i, y, x)
-                    if message.reply_to_message
-                    else await app.send_message(i, text=query)
-                )
-                if "-pin" in message.text:
-                    try:
-                        await m.pin(disable_notification=True)
-                        pin += 1
-                    except:
-                        continue
-                elif "-pinloud" in message.text:
-                    try:
-                        await m.pin(disable_notification=False)
-                        pin += 1
-                    except:
-                        continue
-                sent += 1
-                await asyncio.sleep(0.2)
-            except FloodWait as fw:
-                flood_time = int(fw.value)
-                if flood_time > 200:
-                    continue
-                await asyncio.sleep(flood_time)
-            except:
-                continue
-        try:
-            await message.reply_text(_["broad_3"].format(sent, pin))
-        except:
-            pass
-
-    if "-user" in message.text:
-        susr = 0
-        served_users = []
-        susers = await get_served_users()
-        for user in susers:
-            served_users.append(int(user["user_id"]))
-        for i in served_users:
-            try:
-                m = (
-                    await app.forward_messages(i, y, x)
-                    if message.reply_to_message
-                    else await app.send_message(i, text=query)
+    status = await message.reply_text(_["broad_1"])
+    try:
+        if payload.get("bot"):
+            stage = await _run_stage(
+                job_id,
+                "chats",
+                await get_served_chat_ids(),
+                _sender(app, payload, pin=True),
+                job_state,
+                status,
+                _,
+            )
+            with contextlib.suppress(Exception):
+                await message.reply_text(_["broad_3"].format(stage.sent, stage.pins))
+
+        if payload.get("user"):
+            stage = await _run_stage(
+                job_id,
+                "users",
+                await get_served_user_ids(),
+                _sender(app, payload),
+                job_state,
+                status,
+                _,
+            )
+            with contextlib.suppress(Exception):
+                await message.reply_text(_["broad_4"].format(stage.sent))
+
+        if payload.get("assistant"):
+            aw = await message.reply_text(_["broad_5"])
+            text = _["broad_6"]
+            from Tune.core.userbot import assistants
+
+            for num in assistants:
+                client = await get_client(num)
+                dialogs = [dialog.chat.id async for dialog in client.get_dialogs()]
+                stage = await _run_stage(
+                    job_id,
+                    f"assistant{num}",
+                    dialogs,
+                    _sender(client, payload),
+                    job_state,
+                    status,
+                    _,
+                    # user accounts get spam-limited far below the bot API rate
+                    rate=ASSISTANT_BROADCAST_RATE,
+                    workers=1,
                 )
-                susr += 1
-                await asyncio.sleep(0.2)
-            except FloodWait as fw:
-                flood_time = int(fw.value)
-                if flood_time > 200:
-                    continue
-                await asyncio.sleep(flood_time)
-            except:
-                pass
-        try:
-            await message.reply_text(_["broad_4"].format(susr))
-        except:
-            pass
-
-    if "-assistant" in message.text:
-        aw = await message.reply_text(_["broad_5"])
-        text = _["broad_6"]
-        from Tune.core.userbot import assistants
-
-        for num in assistants:
-            sent = 0
-            client = await get_client(num)
-            async for dialog in client.get_dialogs():
-                try:
-                    await client.forward_messages(
-                        dialog.chat.id, y, x
-                    ) if message.reply_to_message else await client.send_message(
-                        dialog.chat.id, text=query
-                    )
-                    sent += 1
-                    await asyncio.sleep(3)
-                except FloodWait as fw:
-                    flood_time = int(fw.value)
-                    if flood_time > 200:
-                        continue
-                    await asyncio.sleep(flood_time)
-                except:
-                    continue
-            text += _["broad_7"].format(num, sent)
-        try:
-            await aw.edit_text(text)
-        except:
-            pass
-    IS_BROADCASTING = False
+                text += _["broad_7"].format(num, stage.sent)
+            with contextlib.suppress(Exception):
+                await aw.edit_text(text)
+        await finish_job(job_id)
+    finally:
+        IS_BROADCASTING = False
 
 
+@scheduler.every(10)
 async def auto_clean():
-    while not await asyncio.sleep(10):
-        try:
-            served_chats = await get_active_chats()
-            for chat_id in served_chats:
-                if chat_id not in adminlist:
-                    adminlist[chat_id] = []
-                    async for user in app.get_chat_members(
-                        chat_id, filter=ChatMembersFilter.ADMINISTRATORS
-                    ):
-                        if getattr(user.privileges, 'can_manage_video_chats', False):
-                            adminlist[chat_id].append(user.user.id)
-                    authusers = await get_authuser_names(chat_id)
-                    for user in authusers:
-                        user_id = await alpha_to_int(user)
-                        adminlist[chat_id].append(user_id)
-        except:
-            continue
-
-
-asyncio.create_task(auto_clean())
+    for chat_id in scheduler.active_chats:
+        if chat_id not in adminlist:
+            adminlist[chat_id] = []
+            async for user in app.get_chat_members(
+                chat_id, filter=ChatMembersFilter.ADMINISTRATORS
+            ):
+                if getattr(user.privileges, 'can_manage_video_chats', False):
+                    adminlist[chat_id].append(user.user.id)
+            authusers = await get_authuser_names(chat_id)
+            for user in authusers:
+                user_id = await alpha_to_int(user)
+                adminlist[chat_id].append(user_id)
@@ -0,0 +1,29 @@
+from Tune.logging import LOGGER
+from Tune.utils.backends import backend_stats
+from Tune.utils.dlqueue import download_scheduler
+from Tune.utils.mediacache import media_cache
+from Tune.utils.normalize import normalizer
+from Tune.utils.progress import progress_updater
+from Tune.utils.scheduler import scheduler
+from Tune.utils.thumbnails import render_histogram
+from Tune.utils.tuning import STATS_LOG_INTERVAL
+
+
+async def log_stats():
+    """Write the counters of the download, playback and background machinery to the log."""
+    sections = {
+        "downloads": download_scheduler.stats,
+        "backends": backend_stats,
+        "jobs": scheduler.stats,
+        "progress": progress_updater.stats,
+        "thumbnails": render_histogram,
+        "media_cache": media_cache.stats,
+        "normalize": normalizer.stats,
+    }
+    log = LOGGER(__name__)
+    for name, stats in sections.items():
+        log.info(f"{name}: {stats()}")
+
+
+if STATS_LOG_INTERVAL > 0:
+    scheduler.add("log_stats", log_stats, STATS_LOG_INTERVAL)
@@ -17,9 +17,11 @@ from config import (
     SONG_DOWNLOAD_DURATION_LIMIT,
 )
 from Tune.utils.decorators.language import language, languageCB
+from Tune.utils.dlqueue import Priority, download_priority
 from Tune.utils.errors import capture_err, capture_callback_err
 from Tune.utils.formatters import convert_bytes, time_to_seconds
 from Tune.utils.inline.song import song_markup
+from Tune.utils.mediastore import media_store
 
 SONG_COMMAND = ["song"]
 
@@ -162,6 +164,7 @@ async def song_download_cb(client, cq, lang):
     mystic = await cq.edit_message_text(lang["song_8"])
 
     file_path = None
+    store_key = f"song_{stype}:{fmt_id}"
     try:
         info, _ = await YouTube.track(yturl)
         raw_title = info.get("title") or "Song"
@@ -169,39 +172,51 @@ async def song_download_cb(client, cq, lang):
         duration_sec = time_to_seconds(info.get("duration_min")) if info.get("duration_min") else None
 
         if stype == "audio":
-            file_path, _ = await YouTube.download(
-                yturl, mystic, songaudio=True, format_id=fmt_id, title=title
-            )
-            if not file_path:
-                raise RuntimeError("no audio file")
-            await app.send_chat_action(cq.message.chat.id, ChatAction.UPLOAD_AUDIO)
-            await cq.edit_message_media(
-                InputMediaAudio(
-                    media=file_path,
+            action = ChatAction.UPLOAD_AUDIO
+
+            def build(media):
+                return InputMediaAudio(
+                    media=media,
                     caption=title,
                     title=title,
                     performer=info.get("uploader"),
                 )
-            )
         else:
-            file_path, _ = await YouTube.download(
-                yturl, mystic, songvideo=True, format_id=fmt_id, title=title
-            )
-            if not file_path:
-                raise RuntimeError("no video file")
-            await app.send_chat_action(cq.message.chat.id, ChatAction.UPLOAD_VIDEO)
+            action = ChatAction.UPLOAD_VIDEO
             w = getattr(getattr(cq.message, "photo", None), "width", None)
             h = getattr(getattr(cq.message, "photo", None), "height", None)
-            await cq.edit_message_media(
-                InputMediaVideo(
-                    media=file_path,
+
+            def build(media):
+                return InputMediaVideo(
+                    media=media,
                     duration=duration_sec,
                     width=w,
                     height=h,
                     caption=title,
                     supports_streaming=True,
                 )
-            )
+
+        stored = await media_store.get(vidid, store_key)
+        if stored:
+            try:
+                return await cq.edit_message_media(build(stored["file_id"]))
+            except Exception:
+                await media_store.invalidate(vidid, store_key)
+
+        with download_priority(Priority.EXPORT, cq.message.chat.id):
+            if stype == "audio":
+                file_path, _ = await YouTube.download(
+                    yturl, mystic, songaudio=True, format_id=fmt_id, title=title
+                )
+            else:
+                file_path, _ = await YouTube.download(
+                    yturl, mystic, songvideo=True, format_id=fmt_id, title=title
+                )
+        if not file_path:
+            raise RuntimeError(f"no {stype} file")
+        await app.send_chat_action(cq.message.chat.id, action)
+        sent = await cq.edit_message_media(build(file_path))
+        await media_store.keep(vidid, store_key, sent)
 
     except Exception:
         await mystic.edit_text(lang["song_10"])
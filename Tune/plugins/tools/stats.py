@@ -13,7 +13,7 @@ from Tune import app
 from Tune.core.userbot import assistants
 from Tune.misc import SUDOERS, mongodb
 from Tune.plugins import ALL_MODULES
-from Tune.utils.database import get_served_chats, get_served_users, get_sudoers
+from Tune.utils.database import get_served_chats_count, get_served_users_count, get_sudoers
 from Tune.utils.decorators.language import language, languageCB
 from Tune.utils.inline.stats import back_stats_buttons, stats_buttons
 from config import BANNED_USERS
@@ -50,8 +50,8 @@ async def overall_stats(client, CallbackQuery, _):
     except:
         pass
     await CallbackQuery.edit_message_text(_["gstats_1"].format(app.mention))
-    served_chats = len(await get_served_chats())
-    served_users = len(await get_served_users())
+    served_chats = await get_served_chats_count()
+    served_users = await get_served_users_count()
     text = _["gstats_3"].format(
         app.mention,
         len(assistants),
@@ -101,8 +101,8 @@ async def bot_stats(client, CallbackQuery, _):
     call = await mongodb.command("dbstats")
     datasize = call["dataSize"] / 1024
     storage = call["storageSize"] / 1024
-    served_chats = len(await get_served_chats())
-    served_users = len(await get_served_users())
+    served_chats = await get_served_chats_count()
+    served_users = await get_served_users_count()
     text = _["gstats_5"].format(
         app.mention,
         len(ALL_MODULES),
@@ -0,0 +1,119 @@
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from Tune.logging import LOGGER
+from Tune.utils.tuning import BREAKER_COOLDOWN, BREAKER_FAILURES, RACE_HEDGE_DELAY
+
+Fetch = Callable[[], Awaitable[Optional[str]]]
+
+
+class Backend:
+    """
+    Latency and outcome record of one download source, with a circuit breaker:
+    after ``BREAKER_FAILURES`` failures in a row, or a 403/429, the source is
+    left out of races for ``BREAKER_COOLDOWN`` seconds.
+    """
+
+    def __init__(self, name: str, window: int = 50):
+        self.name = name
+        self.latencies = deque(maxlen=window)
+        self.successes = 0
+        self.failures = 0
+        self.wins = 0
+        self.trips = 0
+        self._streak = 0
+        self._open_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._open_until
+
+    def p50(self) -> Optional[float]:
+        return statistics.median(self.latencies) if self.latencies else None
+
+    def trip(self, reason: str = "") -> None:
+        self._open_until = time.monotonic() + BREAKER_COOLDOWN
+        self.trips += 1
+        LOGGER(__name__).warning(
+            f"Download source {self.name} disabled for {BREAKER_COOLDOWN}s {reason}".rstrip()
+        )
+
+    def record(self, ok: bool, latency: float) -> None:
+        if ok:
+            self.successes += 1
+            self._streak = 0
+            self.latencies.append(latency)
+            return
+        self.failures += 1
+        self._streak += 1
+        if self._streak >= BREAKER_FAILURES:
+            self.trip(f"after {self._streak} failures")
+
+    async def timed(self, fetch: Fetch) -> Optional[str]:
+        started = time.monotonic()
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            result = None
+        self.record(bool(result), time.monotonic() - started)
+        return result
+
+    def stats(self) -> Dict[str, object]:
+        p50 = self.p50()
+        return {
+            "available": self.available,
+            "wins": self.wins,
+            "successes": self.successes,
+            "failures": self.failures,
+            "trips": self.trips,
+            "p50_ms": int(p50 * 1000) if p50 is not None else None,
+        }
+
+
+ytdlp_backend = Backend("yt-dlp")
+api_backend = Backend("api")
+
+
+async def race(sources: List[Tuple[Backend, Fetch]]) -> Optional[str]:
+    """
+    Fetch from the fastest available source; the next one is started only if
+    the current leader has not finished within its median latency, or failed.
+    The first result wins and the remaining attempts are cancelled.
+    """
+    ready = [s for s in sources if s[0].available] or sources
+    ready.sort(key=lambda s: s[0].p50() if s[0].p50() is not None else float("inf"))
+    hedge = ready[0][0].p50() or RACE_HEDGE_DELAY
+
+    running: Dict[asyncio.Future, Backend] = {}
+    try:
+        while ready or running:
+            if ready and not running:
+                backend, fetch = ready.pop(0)
+                running[asyncio.ensure_future(backend.timed(fetch))] = backend
+            done, _ = await asyncio.wait(
+                running,
+                timeout=hedge if ready else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                backend, fetch = ready.pop(0)
+                running[asyncio.ensure_future(backend.timed(fetch))] = backend
+                continue
+            for task in done:
+                backend = running.pop(task)
+                if task.result():
+                    backend.wins += 1
+                    return task.result()
+    finally:
+        for task in running:
+            task.cancel()
+    return None
+
+
+def backend_stats() -> Dict[str, Dict[str, object]]:
+    return {b.name: b.stats() for b in (ytdlp_backend, api_backend)}
@@ -0,0 +1,191 @@
+import asyncio
+import contextlib
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pyrogram.errors import FloodWait
+
+from Tune.core.mongo import mongodb
+from Tune.logging import LOGGER
+from Tune.utils.tuning import (
+    BROADCAST_RATE,
+    BROADCAST_RETRIES,
+    BROADCAST_WORKERS,
+)
+
+broadcastdb = mongodb.broadcasts
+
+PERSIST_INTERVAL = 5
+PROGRESS_INTERVAL = 15
+
+
+class TokenBucket:
+    """
+    Token bucket shared by all workers of a broadcast. A FloodWait blocks every
+    worker for the requested time and halves the rate; each success nudges the
+    rate back up towards the configured maximum.
+    """
+
+    def __init__(self, rate: float, floor: float = 1.0):
+        self.max_rate = rate
+        self.rate = rate
+        self.floor = min(floor, rate)
+        self._tokens = rate
+        self._stamp = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._tokens = min(self.rate, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def flood(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self.rate = max(self.floor, self.rate / 2)
+        self._tokens = 0
+
+    def success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+
+
+class BroadcastStage:
+    """
+    Delivers one payload to a sorted list of target ids with ``workers``
+    concurrent workers sharing a ``rate`` messages/s bucket. ``cursor`` is the
+    highest id below which every target has been handled, and is persisted so an
+    interrupted stage resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        job_id,
+        name: str,
+        targets: List[int],
+        send: Callable[["BroadcastStage", int], Awaitable[bool]],
+        state: Optional[Dict] = None,
+        rate: float = BROADCAST_RATE,
+        workers: int = BROADCAST_WORKERS,
+    ):
+        state = state or {}
+        self.job_id = job_id
+        self.name = name
+        self.cursor = state.get("cursor")
+        self.targets = sorted(t for t in targets if self.cursor is None or t > self.cursor)
+        self.send = send
+        self.sent = state.get("sent", 0)
+        self.failed = state.get("failed", 0)
+        self.pins = state.get("pins", 0)
+        self.total = self.sent + self.failed + len(self.targets)
+        self.bucket = TokenBucket(rate)
+        self.workers = workers
+        self.started = time.monotonic()
+        self._done_here = 0
+        self._next = 0
+        self._finished = set()
+        self._low = 0
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed
+
+    @property
+    def eta(self) -> int:
+        elapsed = time.monotonic() - self.started
+        if not self._done_here or not elapsed:
+            return 0
+        return int((self.total - self.processed) * elapsed / self._done_here)
+
+    def state(self) -> Dict:
+        return {
+            "cursor": self.cursor,
+            "sent": self.sent,
+            "failed": self.failed,
+            "pins": self.pins,
+            "total": self.total,
+        }
+
+    async def persist(self, done: bool = False) -> None:
+        update = {f"stages.{self.name}": dict(self.state(), done=done)}
+        with contextlib.suppress(Exception):
+            await broadcastdb.update_one({"_id": self.job_id}, {"$set": update})
+
+    def _complete(self, index: int) -> None:
+        self._finished.add(index)
+        while self._low in self._finished:
+            self._finished.discard(self._low)
+            self.cursor = self.targets[self._low]
+            self._low += 1
+
+    async def _deliver(self, target: int) -> bool:
+        for _ in range(BROADCAST_RETRIES):
+            await self.bucket.acquire()
+            try:
+                ok = await self.send(self, target)
+            except FloodWait as fw:
+                self.bucket.flood(int(fw.value))
+                continue
+            except Exception:
+                return False
+            self.bucket.success()
+            return ok is not False
+        return False
+
+    async def _worker(self) -> None:
+        while self._next < len(self.targets):
+            index = self._next
+            self._next += 1
+            if await self._deliver(self.targets[index]):
+                self.sent += 1
+            else:
+                self.failed += 1
+            self._done_here += 1
+            self._complete(index)
+
+    async def _checkpoint(self, on_progress) -> None:
+        last_progress = time.monotonic()
+        while True:
+            await asyncio.sleep(PERSIST_INTERVAL)
+            await self.persist()
+            if on_progress and time.monotonic() - last_progress >= PROGRESS_INTERVAL:
+                last_progress = time.monotonic()
+                with contextlib.suppress(Exception):
+                    await on_progress(self)
+
+    async def run(self, on_progress: Optional[Callable] = None) -> "BroadcastStage":
+        checkpoint = asyncio.create_task(self._checkpoint(on_progress))
+        try:
+            workers = min(self.workers, len(self.targets)) or 1
+            await asyncio.gather(*(self._worker() for _ in range(workers)))
+        finally:
+            checkpoint.cancel()
+            await self.persist(done=self._low >= len(self.targets))
+        LOGGER(__name__).info(
+            f"Broadcast {self.job_id}/{self.name}: {self.sent} sent, {self.failed} failed."
+        )
+        return self
+
+
+async def create_job(payload: Dict) -> str:
+    job_id = str(int(time.time() * 1000))
+    await broadcastdb.insert_one(
+        {"_id": job_id, "payload": payload, "stages": {}, "done": False, "created": time.time()}
+    )
+    return job_id
+
+
+async def finish_job(job_id: str) -> None:
+    await broadcastdb.update_one({"_id": job_id}, {"$set": {"done": True}})
+
+
+async def unfinished_job() -> Optional[Dict]:
+    return await broadcastdb.find_one({"done": False}, sort=[("created", -1)])
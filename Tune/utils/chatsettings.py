@@ -0,0 +1,133 @@
+import asyncio
+import contextlib
+from typing import Any, Dict, Optional
+
+from pymongo import UpdateOne
+
+from Tune.core.mongo import mongodb
+from Tune.logging import LOGGER
+from Tune.utils.tuning import SETTINGS_FLUSH_BATCH, SETTINGS_FLUSH_INTERVAL
+
+settingsdb = mongodb.chatsettings
+
+DEFAULTS: Dict[str, Any] = {
+    "lang": "en",
+    "playmode": "Direct",
+    "playtype": "Everyone",
+    "cmode": None,
+    "skipmode": True,
+    "upvotes": 5,
+    "nonadmin": False,
+}
+
+# field -> (legacy collection, value key); a value key of None means the
+# presence of a document stores the non-default value.
+_LEGACY = {
+    "lang": ("language", "lang"),
+    "playmode": ("playmode", "mode"),
+    "playtype": ("playtypedb", "mode"),
+    "cmode": ("cplaymode", "mode"),
+    "upvotes": ("upcount", "mode"),
+    "skipmode": ("skipmode", None),
+    "nonadmin": ("adminauth", None),
+}
+
+
+class ChatSettings:
+    """
+    One settings document per chat, held in memory and written back to Mongo in
+    batches. Chats without a document read the defaults without touching Mongo.
+    """
+
+    def __init__(self, interval: float, batch: int):
+        self.interval = interval
+        self.batch = batch
+        self._docs: Dict[int, Dict[str, Any]] = {}
+        self._dirty: Dict[int, Dict[str, Any]] = {}
+        self._loaded = False
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(self) -> None:
+        """Bulk-load every chat's settings, folding in the legacy per-setting collections."""
+        with contextlib.suppress(Exception):
+            await settingsdb.create_index("chat_id", unique=True)
+        async for doc in settingsdb.find({}):
+            doc.pop("_id", None)
+            chat_id = doc.pop("chat_id", None)
+            if chat_id is not None:
+                self._docs[chat_id] = doc
+
+        migrated = 0
+        for field, (collection, key) in _LEGACY.items():
+            async for doc in mongodb[collection].find({}):
+                chat_id = doc.get("chat_id")
+                if chat_id is None or field in self._docs.get(chat_id, {}):
+                    continue
+                value = doc.get(key) if key else not DEFAULTS[field]
+                self._docs.setdefault(chat_id, {})[field] = value
+                self._dirty.setdefault(chat_id, {})[field] = value
+                migrated += 1
+        self._loaded = True
+        LOGGER(__name__).info(
+            f"Chat settings: {len(self._docs)} chats loaded, {migrated} legacy values migrated."
+        )
+
+    async def _fetch(self, chat_id: int) -> Dict[str, Any]:
+        doc = self._docs.get(chat_id)
+        if doc is not None or self._loaded:
+            return doc or {}
+        doc = await settingsdb.find_one({"chat_id": chat_id}) or {}
+        doc.pop("_id", None)
+        doc.pop("chat_id", None)
+        self._docs[chat_id] = doc
+        return doc
+
+    async def get(self, chat_id: int, field: str) -> Any:
+        doc = self._docs.get(chat_id)
+        if doc is None:
+            doc = await self._fetch(chat_id)
+        return doc.get(field, DEFAULTS[field])
+
+    def set(self, chat_id: int, field: str, value: Any) -> None:
+        self._docs.setdefault(chat_id, {})[field] = value
+        self._dirty.setdefault(chat_id, {})[field] = value
+        if len(self._dirty) >= self.batch:
+            self._wake.set()
+
+    async def flush(self) -> None:
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, {}
+        ops = [
+            UpdateOne({"chat_id": chat_id}, {"$set": fields}, upsert=True)
+            for chat_id, fields in dirty.items()
+        ]
+        try:
+            await settingsdb.bulk_write(ops, ordered=False)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Failed to flush chat settings: {e}")
+            for chat_id, fields in dirty.items():
+                self._dirty.setdefault(chat_id, {}).update(
+                    {k: v for k, v in fields.items() if k not in self._dirty[chat_id]}
+                )
+
+    async def _flusher(self) -> None:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            self._wake.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._flusher())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+chat_settings = ChatSettings(SETTINGS_FLUSH_INTERVAL, SETTINGS_FLUSH_BATCH)
@@ -1,4 +1,7 @@
 import asyncio
+import os
+from typing import Optional
+
 import requests
 from pathlib import Path
 from urllib.parse import urlsplit
@@ -9,6 +12,17 @@ from Tune.utils.errors import capture_internal_err
 COOKIE_PATH = Path("Tune/assets/cookies.txt")
 
 
+def cookiefile_path() -> Optional[str]:
+    """Path of the stored cookie file, or None while it is missing or empty."""
+    path = str(COOKIE_PATH)
+    try:
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            return path
+    except Exception:
+        pass
+    return None
+
+
 def _extract_paste_id(url: str) -> str:
     path = urlsplit(url).path.rstrip("/")
     parts = [p for p in path.split("/") if p]
@@ -102,8 +102,8 @@ def AdminRightsCheck(require_active_chat=True):
                                 if chat_id not in confirmer:
                                     confirmer[chat_id] = {}
                                 try:
-                                    vidid = db[chat_id][0]["vidid"]
-                                    file = db[chat_id][0]["file"]
+                                    vidid = db[chat_id][0].vidid
+                                    file = db[chat_id][0].file
                                 except:
                                     return await message.reply_text(_["admin_14"])
                                 senn = await message.reply_text(text, reply_markup=upl)
@@ -0,0 +1,168 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
+from Tune.utils.tuning import MAX_CONCURRENT
+
+
+class Priority(IntEnum):
+    PLAYING = 0
+    PREFETCH = 1
+    EXPORT = 2
+    BACKGROUND = 3
+
+
+# (priority, chat id) of the code that starts a download; tasks inherit it
+_context: ContextVar[Tuple[Priority, Optional[int]]] = ContextVar(
+    "download_context", default=(Priority.PLAYING, None)
+)
+
+
+@contextlib.contextmanager
+def download_priority(priority: Priority, chat_id: Optional[int] = None):
+    """Run downloads started inside the block with ``priority`` on behalf of ``chat_id``."""
+    token = _context.set((priority, chat_id))
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class _Ticket:
+    __slots__ = ("source", "priority", "chat_id", "future", "enqueued")
+
+    def __init__(self, source: Optional[str], priority: Priority, chat_id: Optional[int]):
+        self.source = source
+        self.priority = priority
+        self.chat_id = chat_id
+        self.future = asyncio.get_running_loop().create_future()
+        self.enqueued = time.monotonic()
+
+
+class _ClassStats:
+    __slots__ = ("granted", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.granted = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class DownloadScheduler:
+    """
+    Hands out ``limit`` download slots. Classes are served in strict priority
+    order; within a class, chats get equal shares by fair queuing, so one
+    chat's long playlist cannot hold back another chat's first track. A waiting
+    download is boosted when a more urgent caller asks for the same source.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._heaps: Dict[Priority, List] = {p: [] for p in Priority}
+        self._vtime: Dict[Priority, float] = {p: 0.0 for p in Priority}
+        self._finish: Dict[Priority, Dict[Optional[int], float]] = {p: {} for p in Priority}
+        self._waiting: Dict[str, List[_Ticket]] = {}
+        self._depth: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._active: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._stats: Dict[Priority, _ClassStats] = {p: _ClassStats() for p in Priority}
+        self._seq = itertools.count()
+
+    def _push(self, ticket: _Ticket) -> None:
+        p = ticket.priority
+        flows = self._finish[p]
+        tag = max(self._vtime[p], flows.get(ticket.chat_id, 0.0)) + 1.0
+        flows[ticket.chat_id] = tag
+        heapq.heappush(self._heaps[p], (tag, next(self._seq), p, ticket))
+        self._depth[p] += 1
+
+    def _dispatch(self) -> None:
+        for p in Priority:
+            heap = self._heaps[p]
+            while heap and self.active < self.limit:
+                tag, _, queued_as, ticket = heapq.heappop(heap)
+                if queued_as != ticket.priority or ticket.future.done():
+                    # stale entry left behind by a boost or a cancelled waiter
+                    continue
+                self._depth[p] -= 1
+                self._vtime[p] = tag
+                if not self._depth[p]:
+                    self._finish[p].clear()
+                self._unlist(ticket)
+                self.active += 1
+                self._active[p] += 1
+                waited = time.monotonic() - ticket.enqueued
+                stats = self._stats[p]
+                stats.granted += 1
+                stats.wait_total += waited
+                stats.wait_max = max(stats.wait_max, waited)
+                ticket.future.set_result(None)
+            if self.active >= self.limit:
+                return
+
+    def _unlist(self, ticket: _Ticket) -> None:
+        tickets = self._waiting.get(ticket.source)
+        if tickets and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                self._waiting.pop(ticket.source, None)
+
+    def boost(self, source: str) -> None:
+        """Raise queued downloads of ``source`` to the caller's priority."""
+        priority, chat_id = _context.get()
+        for ticket in list(self._waiting.get(source, ())):
+            if ticket.priority > priority and not ticket.future.done():
+                self._depth[ticket.priority] -= 1
+                ticket.priority = priority
+                ticket.chat_id = chat_id
+                self._push(ticket)
+        self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, source: Optional[str] = None):
+        priority, chat_id = _context.get()
+        ticket = _Ticket(source, priority, chat_id)
+        if source is not None:
+            self._waiting.setdefault(source, []).append(ticket)
+        self._push(ticket)
+        self._dispatch()
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if not ticket.future.cancelled():
+                # the slot was granted just as the waiter went away
+                self._release(ticket.priority)
+            else:
+                self._depth[ticket.priority] -= 1
+                self._unlist(ticket)
+            raise
+        try:
+            yield
+        finally:
+            self._release(ticket.priority)
+
+    def _release(self, priority: Priority) -> None:
+        self.active -= 1
+        self._active[priority] -= 1
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        out = {}
+        for p in Priority:
+            s = self._stats[p]
+            out[p.name.lower()] = {
+                "queued": self._depth[p],
+                "active": self._active[p],
+                "granted": s.granted,
+                "avg_wait_ms": int(1000 * s.wait_total / s.granted) if s.granted else 0,
+                "max_wait_ms": int(1000 * s.wait_max),
+            }
+        return out
+
+
+download_scheduler = DownloadScheduler(MAX_CONCURRENT)
@@ -1,8 +1,7 @@
 import asyncio
-import contextlib
 import os
 import re
-from typing import Dict, Optional, Union
+from typing import Dict, Optional, Set, Union
 
 import aiofiles
 import aiohttp
@@ -10,16 +9,26 @@ from aiohttp import TCPConnector
 from yt_dlp import YoutubeDL
 
 from Tune.core.dir import DOWNLOAD_DIR as _DOWNLOAD_DIR, CACHE_DIR
-from Tune.utils.cookie_handler import COOKIE_PATH
-from Tune.utils.tuning import CHUNK_SIZE, SEM
+from Tune.utils.backends import api_backend, race, ytdlp_backend
+from Tune.utils.dlqueue import download_scheduler
+from Tune.utils.cookie_handler import cookiefile_path
+from Tune.utils.mediacache import media_cache, media_key, source_key
+from Tune.utils.mediainfo import media_info
+from Tune.utils.mediastore import media_store
+from Tune.utils.normalize import normalizer
+from Tune.utils.tuning import API_POLL_MAX, CHUNK_SIZE, PROGRESSIVE_BUFFER
+from Tune.utils.ytinfo import Extraction, forget_extraction, get_extraction
 from config import API_KEY, API_URL
 
 USE_API: bool = bool(API_URL and API_KEY)
 
-_COOKIES_FILE = str(COOKIE_PATH)
+_inflight: Dict[str, asyncio.Task] = {}
+_waiters: Dict[asyncio.Task, int] = {}
+_growing: Dict[str, asyncio.Future] = {}
+_background: Set[asyncio.Future] = set()
 
-_inflight: Dict[str, asyncio.Future] = {}
-_inflight_lock = asyncio.Lock()
+# yt-dlp reports a blocked client as an HTTP error in the exception text
+_BLOCKED_RE = re.compile(r"HTTP Error (403|429)")
 
 _session: Optional[aiohttp.ClientSession] = None
 _session_lock = asyncio.Lock()
@@ -31,23 +40,8 @@ def extract_video_id(link: str) -> str:
     return link.split("/")[-1].split("?")[0]
 
 
-def _cookiefile_path() -> Optional[str]:
-    try:
-        if _COOKIES_FILE and os.path.exists(_COOKIES_FILE) and os.path.getsize(
-            _COOKIES_FILE
-        ) > 0:
-            return _COOKIES_FILE
-    except Exception:
-        pass
-    return None
-
-
-def file_exists(video_id: str) -> Optional[str]:
-    for ext in ("mp3", "m4a", "webm"):
-        path = f"{_DOWNLOAD_DIR}/{video_id}.{ext}"
-        if os.path.exists(path):
-            return path
-    return None
+def file_exists(video_id: str, kind: str = "audio") -> Optional[str]:
+    return media_cache.lookup(media_key(video_id, kind))
 
 
 def _safe_filename(name: str) -> str:
@@ -70,13 +64,13 @@ def _ytdlp_base_opts() -> Dict[str, Union[str, int, bool]]:
         "fragment_retries": 3,
         "cachedir": str(CACHE_DIR),
     }
-    cookiefile = _cookiefile_path()
+    cookiefile = cookiefile_path()
     if cookiefile:
         opts["cookiefile"] = cookiefile
     return opts
 
 
-async def _get_session() -> aiohttp.ClientSession:
+async def get_session() -> aiohttp.ClientSession:
     global _session
     if _session and not _session.closed:
         return _session
@@ -95,15 +89,20 @@ async def api_download_song(link: str) -> Optional[str]:
     vid = extract_video_id(link)
     poll_url = f"{API_URL}/song/{vid}?api={API_KEY}"
     try:
-        session = await _get_session()
+        session = await get_session()
+        delay = 0.5
         while True:
             async with session.get(poll_url) as r:
+                if r.status in (403, 429):
+                    api_backend.trip(f"(HTTP {r.status})")
+                    return None
                 if r.status != 200:
                     return None
                 data = await r.json()
                 s = str(data.get("status", "")).lower()
                 if s == "downloading":
-                    await asyncio.sleep(1.5)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, API_POLL_MAX)
                     continue
                 if s != "done":
                     return None
@@ -118,84 +117,150 @@ async def api_download_song(link: str) -> Optional[str]:
                             if not chunk:
                                 break
                             await f.write(chunk)
-                return out_path
+                return media_cache.add(media_key(source_key(link)), out_path)
     except Exception:
         return None
 
 
-def _download_ytdlp(link: str, opts: Dict) -> Optional[str]:
+def _download_ytdlp(extraction: Extraction, opts: Dict, kind: str) -> Optional[str]:
+    try:
+        info = extraction.process(opts)
+        path = f"{_DOWNLOAD_DIR}/{info.get('id')}.{info.get('ext') or 'webm'}"
+        if not os.path.exists(path):
+            extraction.process(opts, download=True)
+        return media_cache.add(media_key(source_key(extraction.url), kind), path)
+    except Exception as e:
+        if _BLOCKED_RE.search(str(e)):
+            ytdlp_backend.trip(f"({e})")
+        return None
+
+
+def _download_progressive(extraction: Extraction, opts: Dict, ready, done) -> Optional[str]:
+    path = None
+    result = None
+
+    def hook(d):
+        nonlocal path
+        filename = d.get("filename")
+        if not filename or path:
+            return
+        if d.get("status") == "finished" or (d.get("downloaded_bytes") or 0) >= PROGRESSIVE_BUFFER:
+            path = filename
+            ready(filename)
+
+    opts = dict(opts, nopart=True, progress_hooks=[hook])
     try:
         with YoutubeDL(opts) as ydl:
-            info = ydl.extract_info(link, download=False)
-            ext = info.get("ext") or "webm"
-            vid = info.get("id")
-            path = f"{_DOWNLOAD_DIR}/{vid}.{ext}"
-            if os.path.exists(path):
-                return path
-            ydl.download([link])
-            return path
+            info = ydl.process_ie_result(extraction.copy(), download=True)
+            final = path or ydl.prepare_filename(info)
+        result = media_cache.add(media_key(source_key(extraction.url)), final)
+        return result
     except Exception:
         return None
+    finally:
+        if path:
+            done(path, result)
+
+
+def is_growing(path: str) -> bool:
+    """True while ``path`` is still being written by a progressive download."""
+    return path in _growing
 
 
-async def _with_sem(coro):
-    async with SEM:
-        return await coro
+def when_complete(path: str) -> Optional[asyncio.Future]:
+    """Future resolving to the finished file (None on failure) of a growing ``path``."""
+    return _growing.get(path)
 
 
-async def _dedup(key: str, runner):
-    async with _inflight_lock:
-        fut = _inflight.get(key)
-        if fut:
-            return await fut
-        fut = asyncio.get_running_loop().create_future()
-        _inflight[key] = fut
+async def _scheduled(source: str, fn, *args):
+    """Run blocking ``fn`` in the executor once the scheduler grants ``source`` a slot."""
+    async with download_scheduler.slot(source):
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+async def _guard(runner):
     try:
-        res = await runner()
-        fut.set_result(res)
-        return res
+        result = await runner()
     except Exception:
-        fut.set_result(None)
         return None
+    if isinstance(result, str) and os.path.isfile(result):
+        media_info.probe_later(result)
+        normalizer.submit(result)
+    return result
+
+
+async def _tiered(link: str, kind: str, fetch):
+    """On a disk miss, try the Telegram tier before the source and archive what the source returns."""
+    vidid = source_key(link)
+    path = await media_store.restore(vidid, kind)
+    if path:
+        return path
+    path = await fetch()
+    if path:
+        media_store.archive_later(path, vidid, kind)
+    return path
+
+
+async def _dedup(key: str, runner, source: Optional[str] = None):
+    task = _inflight.get(key)
+    if task is not None and source:
+        download_scheduler.boost(source)
+    if task is None:
+        task = asyncio.ensure_future(_guard(runner))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _inflight.pop(key, None) if _inflight.get(key) is t else None)
+    _waiters[task] = _waiters.get(task, 0) + 1
+    try:
+        return await asyncio.shield(task)
     finally:
-        async with _inflight_lock:
-            _inflight.pop(key, None)
+        left = _waiters.pop(task, 1) - 1
+        if left > 0:
+            _waiters[task] = left
+        elif not task.done():
+            # nobody is waiting for this download any more
+            task.cancel()
 
 
 async def yt_dlp_download(
     link: str, type: str, format_id: str = None, title: str = None
 ) -> Optional[str]:
-    loop = asyncio.get_running_loop()
-
     if type == "audio":
         key = f"a:{link}"
 
         async def run():
+            extraction = await get_extraction(link)
             opts = _ytdlp_base_opts()
             opts.update({"format": "bestaudio/best"})
-            return await _with_sem(
-                loop.run_in_executor(None, _download_ytdlp, link, opts)
-            )
+            path = await _scheduled(link, _download_ytdlp, extraction, opts, "audio")
+            if not path:
+                forget_extraction(link)
+            return path
 
-        return await _dedup(key, run)
+        return await _dedup(key, run, link)
 
     if type == "video":
+        cached = file_exists(source_key(link), "video")
+        if cached:
+            return cached
         key = f"v:{link}"
 
         async def run():
+            extraction = await get_extraction(link)
             opts = _ytdlp_base_opts()
             opts.update({"format": "best[height<=?720][width<=?1280]"})
-            return await _with_sem(
-                loop.run_in_executor(None, _download_ytdlp, link, opts)
-            )
+            path = await _scheduled(link, _download_ytdlp, extraction, opts, "video")
+            if not path:
+                forget_extraction(link)
+            return path
 
-        return await _dedup(key, run)
+        return await _dedup(key, lambda: _tiered(link, "video", run), link)
 
     if type == "song_video" and format_id and title:
         safe_title = _safe_filename(title)
         key = f"sv:{link}:{format_id}:{safe_title}"
 
         async def run():
+            extraction = await get_extraction(link)
             opts = _ytdlp_base_opts()
             opts.update(
                 {
@@ -205,18 +270,17 @@ async def yt_dlp_download(
                     "merge_output_format": "mp4",
                 }
             )
-            await _with_sem(
-                loop.run_in_executor(None, lambda: YoutubeDL(opts).download([link]))
-            )
+            await _scheduled(link, extraction.process, opts, True)
             return f"{_DOWNLOAD_DIR}/{safe_title}.mp4"
 
-        return await _dedup(key, run)
+        return await _dedup(key, run, link)
 
     if type == "song_audio" and format_id and title:
         safe_title = _safe_filename(title)
         key = f"sa:{link}:{format_id}:{safe_title}"
 
         async def run():
+            extraction = await get_extraction(link)
             opts = _ytdlp_base_opts()
             opts.update(
                 {
@@ -232,47 +296,81 @@ async def yt_dlp_download(
                     ],
                 }
             )
-            await _with_sem(
-                loop.run_in_executor(None, lambda: YoutubeDL(opts).download([link]))
-            )
+            await _scheduled(link, extraction.process, opts, True)
             return f"{_DOWNLOAD_DIR}/{safe_title}.mp3"
 
-        return await _dedup(key, run)
+        return await _dedup(key, run, link)
 
     return None
 
 
 async def download_audio_concurrent(link: str) -> Optional[str]:
-    vid = extract_video_id(link)
-    cached = file_exists(vid)
+    cached = file_exists(source_key(link))
     if cached:
         return cached
 
-    if not USE_API:
-        return await yt_dlp_download(link, type="audio")
-
     key = f"rac:{link}"
 
+    async def api():
+        async with download_scheduler.slot(link):
+            return await api_download_song(link)
+
     async def run():
-        yt_task = asyncio.create_task(yt_dlp_download(link, type="audio"))
-        api_task = asyncio.create_task(api_download_song(link))
-        done, pending = await asyncio.wait(
-            {yt_task, api_task}, return_when=asyncio.FIRST_COMPLETED
+        if not USE_API:
+            return await yt_dlp_download(link, type="audio")
+        return await race(
+            [
+                (ytdlp_backend, lambda: yt_dlp_download(link, type="audio")),
+                (api_backend, api),
+            ]
         )
-        for t in done:
-            with contextlib.suppress(Exception):
-                res = t.result()
-                if res:
-                    for p in pending:
-                        p.cancel()
-                        with contextlib.suppress(Exception, asyncio.CancelledError):
-                            await p
-                    return res
-        for t in pending:
-            with contextlib.suppress(Exception, asyncio.CancelledError):
-                res = await t
-                if res:
-                    return res
-        return None
 
-    return await _dedup(key, lambda: _with_sem(run()))
\ No newline at end of file
+    return await _dedup(key, lambda: _tiered(link, "audio", run), link)
+
+
+async def progressive_audio(link: str) -> Optional[str]:
+    """
+    Start downloading the audio of ``link`` and return its path once the first
+    PROGRESSIVE_BUFFER bytes are on disk; the download keeps running in the
+    background and the finished file is registered in the media cache.
+    """
+    cached = file_exists(source_key(link))
+    if cached:
+        return cached
+    key = f"a:{link}"
+    if key in _inflight:
+        return await yt_dlp_download(link, type="audio")
+
+    loop = asyncio.get_running_loop()
+    started = loop.create_future()
+
+    def ready(path):
+        def register():
+            _growing.setdefault(path, loop.create_future())
+            if not started.done():
+                started.set_result(path)
+
+        loop.call_soon_threadsafe(register)
+
+    def done(path, final):
+        def complete():
+            future = _growing.pop(path, None)
+            if future and not future.done():
+                future.set_result(final)
+
+        loop.call_soon_threadsafe(complete)
+
+    async def run():
+        extraction = await get_extraction(link)
+        opts = _ytdlp_base_opts()
+        opts.update({"format": "bestaudio/best"})
+        return await _scheduled(link, _download_progressive, extraction, opts, ready, done)
+
+    # a track restored from the storage channel completes ``download`` without ``started``
+    download = asyncio.ensure_future(_dedup(key, lambda: _tiered(link, "audio", run), link))
+    _background.add(download)
+    download.add_done_callback(_background.discard)
+    await asyncio.wait({started, download}, return_when=asyncio.FIRST_COMPLETED)
+    if started.done():
+        return started.result()
+    return download.result()
@@ -0,0 +1,70 @@
+import contextlib
+from typing import Dict, List, Set
+
+from pymongo.errors import DuplicateKeyError
+
+from Tune.logging import LOGGER
+
+
+class IdSet:
+    """
+    In-memory index of the ids stored in a Mongo collection under ``field``.
+    Membership checks are set lookups once loaded; writes are idempotent upserts
+    backed by a unique index.
+    """
+
+    def __init__(self, collection, field: str, query: Dict):
+        self.collection = collection
+        self.field = field
+        self.query = query
+        self._ids: Set[int] = set()
+        self._loaded = False
+
+    async def load(self) -> None:
+        try:
+            await self.collection.create_index(self.field, unique=True)
+        except Exception as e:
+            LOGGER(__name__).warning(
+                f"Unique index on {self.collection.name}.{self.field} not created: {e}"
+            )
+        self._ids = set(await self.collection.distinct(self.field, self.query))
+        self._loaded = True
+
+    async def contains(self, value: int) -> bool:
+        if value in self._ids:
+            return True
+        if self._loaded:
+            return False
+        found = await self.collection.find_one({self.field: value}, {"_id": 0})
+        if found:
+            self._ids.add(value)
+        return bool(found)
+
+    async def add(self, value: int) -> bool:
+        """Add ``value``; returns False if it was already present."""
+        if await self.contains(value):
+            return False
+        self._ids.add(value)
+        with contextlib.suppress(DuplicateKeyError):
+            await self.collection.update_one(
+                {self.field: value}, {"$setOnInsert": {self.field: value}}, upsert=True
+            )
+        return True
+
+    async def remove(self, value: int) -> bool:
+        """Remove ``value``; returns False if it was not present."""
+        if not await self.contains(value):
+            return False
+        self._ids.discard(value)
+        await self.collection.delete_many({self.field: value})
+        return True
+
+    async def ids(self) -> List[int]:
+        if self._loaded:
+            return list(self._ids)
+        return await self.collection.distinct(self.field, self.query)
+
+    async def count(self) -> int:
+        if self._loaded:
+            return len(self._ids)
+        return await self.collection.count_documents(self.query)
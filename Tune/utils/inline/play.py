@@ -1,9 +1,6 @@
-import time
 from pyrogram.types import InlineKeyboardButton
 from Tune.utils.formatters import time_to_seconds
 
-LAST_UPDATE_TIME = {}
-
 
 def track_markup(_, videoid, user_id, channel, fplay):
     return [
@@ -26,15 +23,6 @@ def track_markup(_, videoid, user_id, channel, fplay):
     ]
 
 
-def should_update_progress(chat_id):
-    now = time.time()
-    last = LAST_UPDATE_TIME.get(chat_id, 0)
-    if now - last >= 6:
-        LAST_UPDATE_TIME[chat_id] = now
-        return True
-    return False
-
-
 def generate_progress_bar(played_sec, duration_sec):
     if duration_sec == 0:
         percentage = 0
@@ -56,16 +44,14 @@ def control_buttons(_, chat_id):
     ]]
 
 
-def stream_markup_timer(_, chat_id, played, dur):
-    if not should_update_progress(chat_id):
-        return None
+def progress_label(played, dur):
+    bar = generate_progress_bar(time_to_seconds(played), time_to_seconds(dur))
+    return f"{played} {bar} {dur}"
 
-    played_sec = time_to_seconds(played)
-    duration_sec = time_to_seconds(dur)
-    bar = generate_progress_bar(played_sec, duration_sec)
 
+def stream_markup_timer(_, chat_id, played, dur):
     return (
-        [[InlineKeyboardButton(text=f"{played} {bar} {dur}", callback_data="GetTimer")]] +
+        [[InlineKeyboardButton(text=progress_label(played, dur), callback_data="GetTimer")]] +
         control_buttons(_, chat_id) +
         [[InlineKeyboardButton(text=_["CLOSE_BUTTON"], callback_data="close")]]
     )
@@ -0,0 +1,234 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from Tune.core.dir import DOWNLOAD_DIR
+from Tune.logging import LOGGER
+from Tune.utils.tuning import MEDIA_CACHE_BYTES, MEDIA_CACHE_POLICY
+
+INDEX_PATH = os.path.join(DOWNLOAD_DIR, ".media.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+)
+"""
+
+_ORDER = {
+    "lru": "last_access ASC",
+    "lfu": "hits ASC, last_access ASC",
+}
+
+
+_VIDEO_ID_RE = re.compile(r"[\w-]{11}")
+
+
+def source_key(link: str) -> str:
+    """Stable identity of a media source: the video id for YouTube, a digest otherwise."""
+    if _VIDEO_ID_RE.fullmatch(link):
+        # play, skip and prefetch download by bare id (``videoid=True``)
+        return link
+    if "youtube.com" in link or "youtu.be" in link:
+        if "v=" in link:
+            return link.split("v=")[-1].split("&")[0]
+        return link.split("/")[-1].split("?")[0]
+    return "u" + hashlib.sha1(link.encode()).hexdigest()[:16]
+
+
+def media_key(source: str, kind: str = "audio") -> str:
+    return f"{kind}:{source}"
+
+
+class MediaCache:
+    """
+    Disk cache for downloaded media, indexed in SQLite and bounded by a byte budget.
+    Files are evicted by LRU or LFU once the budget is exceeded; files referenced
+    by a queue are pinned and never evicted.
+    """
+
+    def __init__(self, index_path: str, budget: int, policy: str = "lru"):
+        self.budget = budget
+        self.policy = policy if policy in _ORDER else "lru"
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._pins: Dict[str, int] = {}
+        self._retired: Set[str] = set()
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        self._conn = sqlite3.connect(
+            index_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._total = 0
+        self._reconcile()
+
+    def _reconcile(self) -> None:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, path FROM media").fetchall()
+            stale = [(k,) for k, p in rows if not os.path.isfile(p)]
+            if stale:
+                self._conn.executemany("DELETE FROM media WHERE key = ?", stale)
+            self._total = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM media"
+            ).fetchone()[0]
+        LOGGER(__name__).info(
+            f"Media cache: {len(rows) - len(stale)} files, {self._total >> 20} MiB indexed."
+        )
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the cached path for ``key`` and record a hit, or record a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path FROM media WHERE key = ?", (key,)
+            ).fetchone()
+            if row and os.path.isfile(row[0]):
+                self.hits += 1
+                self._conn.execute(
+                    "UPDATE media SET hits = hits + 1, last_access = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+                return row[0]
+            if row:
+                self._drop(key)
+            self.misses += 1
+            return None
+
+    def peek(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path FROM media WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row and os.path.isfile(row[0]) else None
+
+    def add(self, key: str, path: str) -> Optional[str]:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM media WHERE key = ?", (key,)
+            ).fetchone()
+            if old:
+                self._total -= old[0]
+            self._conn.execute(
+                "INSERT INTO media (key, path, size, hits, created, last_access) "
+                "VALUES (?, ?, ?, 0, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "path = excluded.path, size = excluded.size, last_access = excluded.last_access",
+                (key, path, size, now, now),
+            )
+            self._total += size
+            self._evict()
+        return path
+
+    def manages(self, path: str) -> bool:
+        with self._lock:
+            return bool(
+                self._conn.execute(
+                    "SELECT 1 FROM media WHERE path = ?", (path,)
+                ).fetchone()
+            )
+
+    def replace(self, old_path: str, new_path: str) -> bool:
+        """Point the entries for ``old_path`` at ``new_path`` and drop the old file."""
+        try:
+            size = os.path.getsize(new_path)
+        except OSError:
+            return False
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, size FROM media WHERE path = ?", (old_path,)
+            ).fetchall()
+            if not rows:
+                return False
+            for key, old_size in rows:
+                self._total += size - old_size
+            self._conn.execute(
+                "UPDATE media SET path = ?, size = ? WHERE path = ?",
+                (new_path, size, old_path),
+            )
+            if old_path in self._pins:
+                # still being played; removed once the last queue lets go of it
+                self._retired.add(old_path)
+            else:
+                self._remove_file(old_path)
+        return True
+
+    def _remove_file(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def pin(self, path: str) -> None:
+        with self._lock:
+            self._pins[path] = self._pins.get(path, 0) + 1
+
+    def unpin(self, path: str) -> None:
+        with self._lock:
+            count = self._pins.get(path, 0) - 1
+            if count > 0:
+                self._pins[path] = count
+            else:
+                self._pins.pop(path, None)
+                if path in self._retired:
+                    self._retired.discard(path)
+                    self._remove_file(path)
+
+    def _drop(self, key: str) -> None:
+        row = self._conn.execute(
+            "SELECT size FROM media WHERE key = ?", (key,)
+        ).fetchone()
+        if row:
+            self._total -= row[0]
+            self._conn.execute("DELETE FROM media WHERE key = ?", (key,))
+
+    def _evict(self) -> None:
+        if self._total <= self.budget:
+            return
+        rows = self._conn.execute(
+            f"SELECT key, path, size FROM media ORDER BY {_ORDER[self.policy]}"
+        ).fetchall()
+        for key, path, size in rows:
+            if self._total <= self.budget:
+                break
+            if path in self._pins:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            self._conn.execute("DELETE FROM media WHERE key = ?", (key,))
+            self._total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        lookups = self.hits + self.misses
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM media").fetchone()[0]
+        return {
+            "files": files,
+            "bytes": self._total,
+            "budget": self.budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": int(100 * self.hits / lookups) if lookups else 0,
+        }
+
+
+media_cache = MediaCache(INDEX_PATH, MEDIA_CACHE_BYTES, MEDIA_CACHE_POLICY)
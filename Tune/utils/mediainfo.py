@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from Tune.logging import LOGGER
+from Tune.utils.mediacache import INDEX_PATH
+from Tune.utils.tuning import MEDIAINFO_MAX, YTDLP_TIMEOUT
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mediainfo (
+    key TEXT PRIMARY KEY,
+    info TEXT NOT NULL
+)
+"""
+
+
+def info_key(path: str) -> str:
+    """Local files are keyed by path, size and mtime so a rewritten file is probed again."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return path
+    return f"{os.path.realpath(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _parse(raw: Dict) -> Dict:
+    fmt = raw.get("format", {})
+    streams = []
+    duration = fmt.get("duration")
+    for s in raw.get("streams", []):
+        duration = duration or s.get("duration")
+        streams.append(
+            {
+                "type": s.get("codec_type"),
+                "codec": s.get("codec_name"),
+                "bitrate": int(s.get("bit_rate") or 0),
+                "channels": s.get("channels"),
+                "sample_rate": int(s.get("sample_rate") or 0) or None,
+                "width": s.get("width"),
+                "height": s.get("height"),
+            }
+        )
+    return {
+        "duration": float(duration) if duration else None,
+        "format": fmt.get("format_name"),
+        "bitrate": int(fmt.get("bit_rate") or 0),
+        "streams": streams,
+    }
+
+
+class MediaInfoStore:
+    """
+    ffprobe results kept in memory and persisted in the media cache index, so
+    each file is probed once. Concurrent probes of the same file share one run.
+    """
+
+    def __init__(self, index_path: str, maxsize: int):
+        self.maxsize = maxsize
+        self._mem: "OrderedDict[str, Dict]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            index_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute(_SCHEMA)
+
+    def _remember(self, key: str, info: Dict) -> Dict:
+        self._mem[key] = info
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+        return info
+
+    def _load(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT info FROM mediainfo WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _store(self, key: str, info: Dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO mediainfo (key, info) VALUES (?, ?)",
+                (key, json.dumps(info)),
+            )
+
+    async def _ffprobe(self, path: str) -> Optional[Dict]:
+        proc = await asyncio.create_subprocess_exec(
+            "ffprobe",
+            "-loglevel",
+            "quiet",
+            "-print_format",
+            "json",
+            "-show_format",
+            "-show_streams",
+            path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            out, _ = await asyncio.wait_for(proc.communicate(), timeout=YTDLP_TIMEOUT)
+        except asyncio.TimeoutError:
+            proc.kill()
+            return None
+        try:
+            return _parse(json.loads(out or b"{}"))
+        except (ValueError, TypeError):
+            return None
+
+    async def probe(self, path: str) -> Optional[Dict]:
+        key = info_key(path)
+        info = self._mem.get(key)
+        if info is not None:
+            self._mem.move_to_end(key)
+            return info
+        info = self._load(key)
+        if info is not None:
+            return self._remember(key, info)
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._ffprobe(path))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        info = await asyncio.shield(task)
+        if not info:
+            return None
+        # only files are worth keeping across restarts; stream urls expire
+        if os.path.isfile(path):
+            self._store(key, info)
+        return self._remember(key, info)
+
+    async def duration(self, path: str) -> Optional[float]:
+        info = await self.probe(path)
+        return info["duration"] if info else None
+
+    def probe_later(self, path: str) -> None:
+        """Probe ``path`` in the background, e.g. right after it was downloaded."""
+        task = asyncio.ensure_future(self.probe(path))
+        task.add_done_callback(
+            lambda t: t.cancelled()
+            or t.exception() is None
+            or LOGGER(__name__).debug(f"Probe of {path} failed: {t.exception()}")
+        )
+
+
+media_info = MediaInfoStore(INDEX_PATH, MEDIAINFO_MAX)
@@ -0,0 +1,121 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Set
+
+from pyrogram.types import Message
+
+from Tune import app
+from Tune.core.dir import DOWNLOAD_DIR
+from Tune.core.mongo import mongodb
+from Tune.logging import LOGGER
+from Tune.utils.mediacache import media_cache, media_key
+from config import MEDIA_CHANNEL_ID
+
+storedb = mongodb.mediastore
+
+
+def _media_of(message: Message):
+    return message.audio or message.video or message.document or message.voice
+
+
+class MediaStore:
+    """
+    Second storage tier behind the disk cache. Files uploaded to Telegram are
+    indexed by (video id, format) with their ``file_id``; with MEDIA_CHANNEL_ID
+    set they are also kept in that channel, so evicted tracks are fetched back
+    from Telegram instead of being downloaded from the source again.
+    """
+
+    def __init__(self, channel_id: int):
+        self.channel_id = channel_id
+        self._ids: Dict[str, Optional[Dict]] = {}
+        self._busy: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.restored = 0
+        self.archived = 0
+
+    async def get(self, vidid: str, fmt: str) -> Optional[Dict]:
+        key = f"{vidid}:{fmt}"
+        if key not in self._ids:
+            self._ids[key] = await storedb.find_one({"_id": key})
+        return self._ids[key]
+
+    async def put(self, vidid: str, fmt: str, message: Message) -> Optional[str]:
+        media = _media_of(message) if message else None
+        if not media:
+            return None
+        key = f"{vidid}:{fmt}"
+        doc = {
+            "_id": key,
+            "file_id": media.file_id,
+            "ext": os.path.splitext(getattr(media, "file_name", None) or "")[1].lstrip("."),
+            "size": media.file_size,
+            "ts": time.time(),
+        }
+        self._ids[key] = doc
+        await storedb.replace_one({"_id": key}, doc, upsert=True)
+        return media.file_id
+
+    async def invalidate(self, vidid: str, fmt: str) -> None:
+        key = f"{vidid}:{fmt}"
+        self._ids[key] = None
+        await storedb.delete_one({"_id": key})
+
+    async def keep(self, vidid: str, fmt: str, message: Message) -> None:
+        """Index the media of a message sent to a user, copying it to the storage channel if set."""
+        try:
+            if self.channel_id:
+                message = await app.copy_message(self.channel_id, message.chat.id, message.id)
+            await self.put(vidid, fmt, message)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not store {vidid}:{fmt}: {e}")
+
+    async def restore(self, vidid: str, kind: str) -> Optional[str]:
+        """Fetch a stored track back into the disk cache; None if it is not stored."""
+        if not self.channel_id:
+            return None
+        doc = await self.get(vidid, kind)
+        if not doc:
+            return None
+        path = os.path.join(DOWNLOAD_DIR, f"{vidid}.{doc.get('ext') or 'bin'}")
+        try:
+            path = await app.download_media(doc["file_id"], file_name=path)
+        except Exception as e:
+            LOGGER(__name__).info(f"Stored copy of {vidid}:{kind} unusable, dropping it: {e}")
+            await self.invalidate(vidid, kind)
+            return None
+        self.restored += 1
+        return media_cache.add(media_key(vidid, kind), path)
+
+    async def _archive(self, path: str, vidid: str, kind: str) -> None:
+        key = f"{vidid}:{kind}"
+        if key in self._busy:
+            return
+        self._busy.add(key)
+        try:
+            if await self.get(vidid, kind):
+                return
+            message = await app.send_document(
+                self.channel_id,
+                path,
+                caption=key,
+                disable_content_type_detection=True,
+                disable_notification=True,
+            )
+            await self.put(vidid, kind, message)
+            self.archived += 1
+        except Exception as e:
+            LOGGER(__name__).warning(f"Archiving {key} to the media channel failed: {e}")
+        finally:
+            self._busy.discard(key)
+
+    def archive_later(self, path: str, vidid: str, kind: str) -> None:
+        """Upload a freshly downloaded track to the storage channel in the background."""
+        if self.channel_id and os.path.isfile(path):
+            task = asyncio.ensure_future(self._archive(path, vidid, kind))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+
+media_store = MediaStore(MEDIA_CHANNEL_ID)
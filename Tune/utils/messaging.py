@@ -0,0 +1,123 @@
+import asyncio
+import contextlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+from pyrogram.errors import FloodWait
+from pyrogram.types import Message
+
+from Tune import app
+from Tune.logging import LOGGER
+from Tune.utils.broadcast import TokenBucket
+from Tune.utils.database import get_chat_topics
+from Tune.utils.tuning import TOPIC_RATE
+
+TOPIC_RETRIES = 2
+
+
+class TopicSender:
+    """
+    Fans a message out to every forum topic configured for a chat. Sends run
+    concurrently under a token bucket per chat; a photo is uploaded to the first
+    topic only and the returned ``file_id`` is reused for the others.
+    """
+
+    def __init__(self, rate: float, maxchats: int = 1024):
+        self.rate = rate
+        self.maxchats = maxchats
+        self._buckets: "OrderedDict[int, TokenBucket]" = OrderedDict()
+
+    def _bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = TokenBucket(self.rate)
+            while len(self._buckets) > self.maxchats:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(chat_id)
+        return bucket
+
+    async def _send(self, chat_id: int, topic_id: int, send: Callable[..., Awaitable[Message]], media: Any):
+        bucket = self._bucket(chat_id)
+        for _ in range(TOPIC_RETRIES):
+            await bucket.acquire()
+            try:
+                message = await send(media, message_thread_id=topic_id)
+            except FloodWait as fw:
+                bucket.flood(int(fw.value))
+                continue
+            except Exception as e:
+                LOGGER(__name__).warning(f"Failed to send to topic {topic_id} in chat {chat_id}: {e}")
+                return None
+            bucket.success()
+            return message
+        return None
+
+    async def fan_out(
+        self,
+        chat_id: int,
+        send: Callable[..., Awaitable[Message]],
+        media: Any = None,
+        file_id: Optional[Callable[[Message], Optional[str]]] = None,
+    ) -> List[Message]:
+        """
+        Calls ``send(media, message_thread_id=...)`` once per topic of ``chat_id``,
+        or once without a topic when none are configured. With ``file_id``, the
+        first delivered message provides the media sent to the remaining topics.
+        Returns the delivered messages in topic order.
+        """
+        topics = await get_chat_topics(chat_id)
+        if not topics:
+            return [await send(media)]
+
+        topics = list(topics)
+        messages: List[Message] = []
+        if file_id is not None:
+            # upload once; the remaining topics get the file_id of the first delivered copy
+            while topics:
+                first = await self._send(chat_id, topics.pop(0), send, media)
+                if first is not None:
+                    messages.append(first)
+                    media = file_id(first) or media
+                    break
+
+        rest = await asyncio.gather(*(self._send(chat_id, t, send, media) for t in topics))
+        return messages + [m for m in rest if m is not None]
+
+
+topic_sender = TopicSender(TOPIC_RATE)
+
+
+def _photo_id(message: Message) -> Optional[str]:
+    return message.photo.file_id if message.photo else None
+
+
+async def send_message_to_topics(chat_id, text, reply_markup=None, disable_web_page_preview=True) -> List[Message]:
+    """Send ``text`` to all topics of a chat, or to the chat itself if it has none."""
+
+    def send(text, **kwargs):
+        return app.send_message(
+            chat_id,
+            text,
+            reply_markup=reply_markup,
+            disable_web_page_preview=disable_web_page_preview,
+            **kwargs,
+        )
+
+    return await topic_sender.fan_out(chat_id, send, text)
+
+
+async def send_photo_to_topics(chat_id, photo, caption, reply_markup=None) -> List[Message]:
+    """Send ``photo`` to all topics of a chat, or to the chat itself if it has none."""
+
+    def send(photo, **kwargs):
+        return app.send_photo(chat_id, photo, caption=caption, reply_markup=reply_markup, **kwargs)
+
+    return await topic_sender.fan_out(chat_id, send, photo, file_id=_photo_id)
+
+
+async def delete_messages(messages: Iterable[Message]) -> None:
+    async def delete(message):
+        with contextlib.suppress(Exception):
+            await message.delete()
+
+    await asyncio.gather(*(delete(m) for m in messages if m))
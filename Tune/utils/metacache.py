@@ -0,0 +1,94 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from youtubesearchpython.__future__ import VideosSearch
+
+from Tune.utils.mediacache import source_key
+from Tune.utils.tuning import YOUTUBE_META_MAX, YOUTUBE_META_TTL
+
+
+class MetaCache:
+    """
+    Bounded TTL cache with LRU eviction and request coalescing: concurrent
+    lookups of the same key share one in-flight loader call.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def peek(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if not item:
+            return None
+        ts, value = item
+        if time.monotonic() - ts >= self.ttl:
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for ``key``, loading it once if missing or stale."""
+        value = self.peek(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        value = await asyncio.shield(task)
+        if value:
+            self.put(key, value)
+        return value
+
+
+metacache = MetaCache(YOUTUBE_META_MAX, YOUTUBE_META_TTL)
+
+
+def search_key(query: str) -> str:
+    """Cache key for a lookup: the video id for YouTube links, the normalized text otherwise."""
+    query = query.strip()
+    if "youtube.com" in query or "youtu.be" in query:
+        return f"v:{source_key(query.split('&')[0])}"
+    return "q:" + " ".join(query.lower().split())
+
+
+async def youtube_search(query: str) -> List[Dict]:
+    """Cached single-result ``VideosSearch``; results are also stored under their video id."""
+
+    async def load() -> List[Dict]:
+        try:
+            data = await VideosSearch(query, limit=1).next()
+        except Exception:
+            return []
+        return data.get("result", [])
+
+    key = search_key(query)
+    result = await metacache.get(key, load)
+    if result and result[0].get("id") and not key.startswith("v:"):
+        metacache.put(f"v:{result[0]['id']}", result)
+    return result or []
+
+
+async def video_info(videoid: str) -> Optional[Dict]:
+    result = await youtube_search(f"https://www.youtube.com/watch?v={videoid}")
+    return result[0] if result else None
@@ -0,0 +1,122 @@
+import asyncio
+import os
+from typing import Dict, List, Optional, Tuple
+
+from Tune.logging import LOGGER
+from Tune.utils.mediacache import media_cache
+from Tune.utils.mediainfo import media_info
+from Tune.utils.streamprofile import audio_format, video_geometry
+from Tune.utils.tuning import NORMALIZE_MEDIA, NORMALIZE_WORKERS
+
+
+# sample rates the ffmpeg AAC encoder accepts; anything else is stored as FLAC
+_AAC_RATES = {96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350}
+
+
+def _audio_args(rate: int, channels: int) -> Tuple[List[str], bool]:
+    """Encoder arguments for ``rate``/``channels`` and whether the codec is AAC."""
+    if rate in _AAC_RATES:
+        return ["-ar", str(rate), "-ac", str(channels), "-c:a", "aac", "-b:a", "192k"], True
+    return ["-ar", str(rate), "-ac", str(channels), "-c:a", "flac"], False
+
+
+def _plan(info: Dict) -> Optional[Tuple[List[str], str, str]]:
+    """ffmpeg output arguments, muxer and extension for ``info``, or None if it already fits."""
+    streams = info.get("streams") or []
+    video = next((s for s in streams if s["type"] == "video"), None)
+    audio = [s for s in streams if s["type"] == "audio"]
+    rate, channels = audio_format(video=video is not None)
+    audio_ok = all(s["sample_rate"] == rate and s["channels"] == channels for s in audio)
+    if audio_ok:
+        audio_args, aac = ["-c:a", "copy"], all(s["codec"] == "aac" for s in audio)
+    else:
+        audio_args, aac = _audio_args(rate, channels)
+
+    if video is None:
+        if audio_ok:
+            return None
+        return (["-vn", *audio_args], "ipod", ".m4a") if aac else (["-vn", *audio_args], "flac", ".flac")
+
+    width, height, _ = video_geometry()
+    # only ever shrink: smaller sources are streamed at their own size
+    video_ok = (video["width"] or 0) <= width and (video["height"] or 0) <= height
+    if audio_ok and video_ok:
+        return None
+    if video_ok:
+        video_args = ["-c:v", "copy"]
+    else:
+        scale = f"scale={width}:{height}:force_original_aspect_ratio=decrease:force_divisible_by=2"
+        video_args = ["-vf", scale, "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p"]
+    if aac:
+        return [*video_args, *audio_args, "-movflags", "+faststart"], "mp4", ".mp4"
+    return [*video_args, *audio_args], "matroska", ".mkv"
+
+
+class Normalizer:
+    """
+    Re-encodes downloaded media to the sample rate and channel layout the call
+    path requests, and shrinks video larger than its frame size, so ffmpeg has
+    nothing to resample or downscale when the track is played. Streams that
+    already fit are copied. Runs at most ``workers`` ffmpeg jobs at once
+    and swaps the result into the media cache.
+    """
+
+    def __init__(self, workers: int):
+        self._sem = asyncio.Semaphore(workers)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.converted = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def submit(self, path: str) -> None:
+        if not NORMALIZE_MEDIA or path in self._inflight or not media_cache.manages(path):
+            return
+        task = asyncio.ensure_future(self._run(path))
+        self._inflight[path] = task
+        task.add_done_callback(lambda _: self._inflight.pop(path, None))
+
+    async def _run(self, path: str) -> None:
+        info = await media_info.probe(path)
+        plan = _plan(info) if info else None
+        if plan is None:
+            self.skipped += 1
+            return
+        args, muxer, ext = plan
+        out = f"{os.path.splitext(path)[0]}.norm{ext}"
+        tmp = f"{out}.part"
+        async with self._sem:
+            proc = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-nostdin", "-loglevel", "error", "-y",
+                "-i", path, *args, "-f", muxer, tmp,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                _, err = await proc.communicate()
+            except asyncio.CancelledError:
+                proc.kill()
+                raise
+        if proc.returncode != 0 or not media_cache.manages(path):
+            if proc.returncode != 0:
+                self.failed += 1
+                LOGGER(__name__).warning(f"Normalizing {path} failed: {err.decode()[-300:]}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        os.replace(tmp, out)
+        if media_cache.replace(path, out):
+            self.converted += 1
+            media_info.probe_later(out)
+        else:
+            os.remove(out)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "converted": self.converted,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "running": len(self._inflight),
+        }
+
+
+normalizer = Normalizer(NORMALIZE_WORKERS)
@@ -0,0 +1,65 @@
+import asyncio
+import contextlib
+from typing import Dict
+
+from Tune import YouTube
+from Tune.logging import LOGGER
+from Tune.misc import db
+from Tune.utils.dlqueue import Priority, download_priority
+from Tune.utils.tuning import PREFETCH_CONCURRENCY, PREFETCH_DEPTH
+
+
+class Prefetcher:
+    """
+    Downloads the next ``depth`` queued YouTube tracks of a chat in the background,
+    so ``Call.play`` finds them in the media cache when the current track ends.
+    """
+
+    def __init__(self, depth: int, concurrency: int):
+        self.depth = depth
+        self._sem = asyncio.Semaphore(concurrency)
+        self._tasks: Dict[int, Dict[str, asyncio.Task]] = {}
+
+    def refresh(self, chat_id: int) -> None:
+        """Re-evaluate the prefetch window after the queue of ``chat_id`` changed."""
+        if self.depth <= 0:
+            return
+        wanted = {}
+        for item in (db.get(chat_id) or [])[1 : 1 + self.depth]:
+            if "vid_" not in str(item.file):
+                continue
+            video = str(item.streamtype) == "video"
+            wanted.setdefault(f"{item.vidid}:{int(video)}", (item, video))
+
+        tasks = self._tasks.setdefault(chat_id, {})
+        for key, task in list(tasks.items()):
+            if key not in wanted:
+                tasks.pop(key).cancel()
+            elif task.done() and (task.cancelled() or not task.result()):
+                # the fetch failed; start it again below
+                del tasks[key]
+        for key, (item, video) in wanted.items():
+            if key not in tasks:
+                tasks[key] = asyncio.create_task(self._fetch(chat_id, item, video))
+        if not tasks:
+            self._tasks.pop(chat_id, None)
+
+    def cancel(self, chat_id: int) -> None:
+        for task in (self._tasks.pop(chat_id, None) or {}).values():
+            task.cancel()
+
+    async def _fetch(self, chat_id: int, item, video: bool) -> bool:
+        """Download ``item``; False if nothing was fetched, so the next refresh retries it."""
+        async with self._sem:
+            with contextlib.suppress(Exception), download_priority(Priority.PREFETCH, chat_id):
+                path, _ = await YouTube.download(
+                    item.vidid, None, videoid=True, video=video, progressive=False
+                )
+                # keep it on disk until the entry is played or dropped
+                item.hold(path)
+                LOGGER(__name__).debug(f"Prefetched {item.vidid}")
+                return bool(path)
+        return False
+
+
+prefetcher = Prefetcher(PREFETCH_DEPTH, PREFETCH_CONCURRENCY)
@@ -0,0 +1,171 @@
+import asyncio
+import time
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+from pyrogram.errors import FloodWait, MessageIdInvalid, MessageNotModified
+from pyrogram.types import InlineKeyboardMarkup, Message
+
+from strings import get_string
+from Tune.logging import LOGGER
+from Tune.misc import db
+from Tune.utils.database import get_lang
+from Tune.utils.formatters import seconds_to_min
+from Tune.utils.inline.play import progress_label, stream_markup_timer
+from Tune.utils.tuning import PROGRESS_INTERVAL, PROGRESS_MAX_BACKOFF, PROGRESS_RATE
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel with one-second slots. A key is scheduled at most once;
+    delays longer than the wheel wait out extra revolutions in their slot.
+    """
+
+    def __init__(self, size: int = 64):
+        self.size = size
+        self.cursor = 0
+        self._slots: List[Dict[Hashable, int]] = [{} for _ in range(size)]
+        self._where: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def schedule(self, key: Hashable, delay: float) -> None:
+        delay = max(1, int(delay))
+        self.cancel(key)
+        index = (self.cursor + delay) % self.size
+        self._slots[index][key] = (delay - 1) // self.size
+        self._where[key] = index
+
+    def cancel(self, key: Hashable) -> None:
+        index = self._where.pop(key, None)
+        if index is not None:
+            self._slots[index].pop(key, None)
+
+    def advance(self) -> List[Hashable]:
+        """Move to the next slot and return the keys that are due."""
+        self.cursor = (self.cursor + 1) % self.size
+        slot = self._slots[self.cursor]
+        due = [key for key, rounds in slot.items() if rounds == 0]
+        for key in due:
+            del slot[key]
+            del self._where[key]
+        for key in slot:
+            slot[key] -= 1
+        return due
+
+
+class ProgressUpdater:
+    """
+    Keeps the progress button of each chat's now-playing message current.
+    Chats enter a timing wheel when a track is announced and are edited only
+    when the rendered ``mm:ss`` label differs from the one last shown, at most
+    ``rate`` edits per second overall. A FloodWait pushes that chat back
+    (doubling up to ``max_backoff``) without slowing the others.
+    """
+
+    def __init__(self, interval: int, rate: int, max_backoff: int):
+        self.interval = interval
+        self.rate = max(1, rate)
+        self.max_backoff = max_backoff
+        self.wheel = TimingWheel()
+        self._shown: Dict[int, Tuple[int, str]] = {}
+        self._backoff: Dict[int, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._runner: Optional[asyncio.Task] = None
+        self.edits = 0
+        self.skipped = 0
+        self.floods = 0
+
+    def announce(self, chat_id: int, messages: List[Message], markup: str) -> None:
+        """Record the now-playing messages of the chat's current track and start updating it."""
+        playing = db.get(chat_id)
+        if not playing:
+            return
+        playing[0].announce(messages, markup)
+        self.watch(chat_id)
+
+    def watch(self, chat_id: int) -> None:
+        self._backoff.pop(chat_id, None)
+        self._schedule(chat_id, self.interval)
+
+    def _schedule(self, chat_id: int, delay: float) -> None:
+        self.wheel.schedule(chat_id, delay)
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.ensure_future(self._run())
+
+    def forget(self, chat_id: int) -> None:
+        self.wheel.cancel(chat_id)
+        self._shown.pop(chat_id, None)
+        self._backoff.pop(chat_id, None)
+
+    async def _run(self) -> None:
+        tick = time.monotonic()
+        while len(self.wheel):
+            tick += 1
+            await asyncio.sleep(max(0.0, tick - time.monotonic()))
+            due = self.wheel.advance()
+            # spill whatever exceeds this second's budget into the next slot
+            for chat_id in due[self.rate:]:
+                self.wheel.schedule(chat_id, 1)
+            for chat_id in due[: self.rate]:
+                task = asyncio.ensure_future(self._update(chat_id))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _update(self, chat_id: int) -> None:
+        playing = db.get(chat_id)
+        entry = playing[0] if playing else None
+        mystic = entry.mystic if entry else None
+        if not mystic or not entry.seconds:
+            self.forget(chat_id)
+            return
+
+        played = seconds_to_min(entry.played)
+        label = progress_label(played, entry.dur)
+        if self._shown.get(chat_id) == (mystic.id, label):
+            self.skipped += 1
+            self._schedule(chat_id, self.interval)
+            return
+
+        try:
+            _ = get_string(await get_lang(chat_id))
+        except Exception:
+            _ = get_string("en")
+        buttons = stream_markup_timer(_, chat_id, played, entry.dur)
+        try:
+            await mystic.edit_reply_markup(reply_markup=InlineKeyboardMarkup(buttons))
+        except FloodWait as fw:
+            self.floods += 1
+            backoff = min(self.max_backoff, max(int(fw.value), self._backoff.get(chat_id, self.interval) * 2))
+            self._backoff[chat_id] = backoff
+            self._schedule(chat_id, backoff)
+            return
+        except MessageNotModified:
+            pass
+        except MessageIdInvalid:
+            # the now-playing message is gone; the next announcement re-registers the chat
+            self.forget(chat_id)
+            return
+        except Exception as e:
+            LOGGER(__name__).debug(f"Progress update for {chat_id} failed: {e}")
+            self._schedule(chat_id, self.interval)
+            return
+        self.edits += 1
+        self._shown[chat_id] = (mystic.id, label)
+        self._backoff.pop(chat_id, None)
+        if chat_id not in self.wheel:
+            self._schedule(chat_id, self.interval)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "watched": len(self.wheel),
+            "edits": self.edits,
+            "skipped": self.skipped,
+            "floods": self.floods,
+        }
+
+
+progress_updater = ProgressUpdater(PROGRESS_INTERVAL, PROGRESS_RATE, PROGRESS_MAX_BACKOFF)
@@ -0,0 +1,175 @@
+import asyncio
+import contextlib
+import random
+import time
+from typing import Awaitable, Callable, Dict, FrozenSet, Optional
+
+from Tune.logging import LOGGER
+from Tune.utils.database import get_active_chats
+from Tune.utils.tuning import SCHEDULER_JITTER
+
+
+class Job:
+    """A periodic coroutine with its next deadline and run-time metrics."""
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[], Awaitable[None]],
+        interval: float,
+        jitter: float,
+        timeout: Optional[float],
+    ):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self.deadline = 0.0
+        self.due = 0.0
+        self.task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failures = 0
+        self.consecutive = 0
+        self.last_ms = 0.0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def plan(self, now: float, delay: Optional[float] = None) -> None:
+        """Set the next deadline ``delay`` from now, or one interval after the last one."""
+        if delay is not None:
+            self.deadline = now + delay
+        else:
+            self.deadline += self.interval
+            if self.deadline <= now:
+                # the run overran: skip the missed deadlines instead of bursting
+                self.deadline += ((now - self.deadline) // self.interval + 1) * self.interval
+        self.due = self.deadline + random.uniform(0, self.jitter * self.interval)
+
+    def record(self, elapsed: float) -> None:
+        ms = elapsed * 1000
+        self.runs += 1
+        self.last_ms = ms
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+
+class Scheduler:
+    """
+    Runs the bot's periodic jobs from one loop. The loop sleeps until the
+    earliest deadline, takes one snapshot of the active chats for every job due
+    at that wakeup (``active_chats``), and runs each job in its own task so a
+    slow or crashing job does not hold up the others. A failed job is retried
+    with exponential backoff capped at its interval; a job never overlaps itself.
+    """
+
+    def __init__(self, jitter: float):
+        self.jitter = jitter
+        self.jobs: Dict[str, Job] = {}
+        self.active_chats: FrozenSet[int] = frozenset()
+        self._wake = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[[], Awaitable[None]],
+        interval: float,
+        timeout: Optional[float] = None,
+    ) -> None:
+        job = Job(name, fn, interval, self.jitter, timeout)
+        self.jobs[name] = job
+        if self._runner is not None:
+            job.plan(time.monotonic(), interval)
+            self._wake.set()
+
+    def every(self, interval: float, name: Optional[str] = None, timeout: Optional[float] = None):
+        def register(fn):
+            self.add(name or fn.__name__, fn, interval, timeout)
+            return fn
+
+        return register
+
+    def start(self) -> None:
+        if self._runner is not None:
+            return
+        now = time.monotonic()
+        for job in self.jobs.values():
+            job.plan(now, job.interval)
+        self._stopping = False
+        self._spawn()
+
+    def _spawn(self) -> None:
+        self._runner = asyncio.create_task(self._run())
+        self._runner.add_done_callback(self._supervise)
+
+    def _supervise(self, task: asyncio.Task) -> None:
+        if self._stopping or task.cancelled():
+            return
+        LOGGER(__name__).error(f"Scheduler loop died, restarting it: {task.exception()!r}")
+        self._spawn()
+
+    async def _run(self) -> None:
+        while True:
+            idle = [job for job in self.jobs.values() if job.task is None]
+            delay = min((job.due for job in idle), default=time.monotonic() + 3600) - time.monotonic()
+            if delay > 0:
+                self._wake.clear()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                continue
+            self.active_chats = frozenset(await get_active_chats())
+            now = time.monotonic()
+            for job in idle:
+                if job.due <= now:
+                    job.task = asyncio.create_task(self._execute(job))
+
+    async def _execute(self, job: Job) -> None:
+        start = time.monotonic()
+        retry = None
+        try:
+            if job.timeout:
+                await asyncio.wait_for(job.fn(), job.timeout)
+            else:
+                await job.fn()
+            job.consecutive = 0
+        except Exception as e:
+            job.failures += 1
+            job.consecutive += 1
+            retry = min(job.interval, 2 ** job.consecutive)
+            LOGGER(__name__).warning(f"Job {job.name} failed, retrying in {retry}s: {e!r}")
+        finally:
+            job.record(time.monotonic() - start)
+            job.task = None
+            if not self._stopping:
+                job.plan(time.monotonic(), retry)
+                self._wake.set()
+
+    async def stop(self) -> None:
+        self._stopping = True
+        tasks = [job.task for job in self.jobs.values() if job.task]
+        if self._runner is not None:
+            tasks.append(self._runner)
+            self._runner = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        now = time.monotonic()
+        return {
+            job.name: {
+                "runs": job.runs,
+                "failures": job.failures,
+                "last_ms": round(job.last_ms, 1),
+                "avg_ms": round(job.total_ms / job.runs, 1) if job.runs else 0.0,
+                "max_ms": round(job.max_ms, 1),
+                "running": job.task is not None,
+                "next_in": round(max(0.0, job.due - now), 1),
+            }
+            for job in self.jobs.values()
+        }
+
+
+scheduler = Scheduler(SCHEDULER_JITTER)
@@ -1,15 +1,20 @@
 import os
 
+from Tune.utils.mediacache import media_cache
 from config import autoclean
 
 
 async def auto_clean(popped):
     try:
-        rem = popped["file"]
+        popped.release()
+        rem = popped.file
         autoclean.remove(rem)
+        media_cache.unpin(rem)
         count = autoclean.count(rem)
         if count == 0:
-            if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
+            if media_cache.manages(rem):
+                return
+            if "vid_" not in rem and "live_" not in rem and "index_" not in rem:
                 try:
                     os.remove(rem)
                 except:
@@ -1,11 +1,269 @@
-import asyncio
-from typing import Union
+import os
+import random
+import time
+from collections import deque
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Union
 
 from Tune.misc import db
-from Tune.utils.formatters import check_duration, seconds_to_min
+from Tune.utils.formatters import seconds_to_min
+from Tune.utils.mediacache import media_cache
+from Tune.utils.mediainfo import media_info
+from Tune.utils.prefetch import prefetcher
 from config import autoclean, time_to_seconds
 
 
+class QueueEntry:
+    """
+    A single queued track. ``seconds`` changes are reflected in the owning queue's total.
+    The playback position is kept as a start timestamp plus time spent paused, so
+    ``played`` is computed on demand instead of being ticked by a background loop.
+    """
+
+    __slots__ = (
+        "title",
+        "dur",
+        "streamtype",
+        "by",
+        "user_id",
+        "chat_id",
+        "file",
+        "vidid",
+        "mystic",
+        "messages",
+        "markup",
+        "speed",
+        "old_dur",
+        "old_second",
+        "_seconds",
+        "_queue",
+        "_started",
+        "_paused_at",
+        "_paused_total",
+        "_held",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        dur: str,
+        streamtype: str,
+        by: str,
+        chat_id: int,
+        file: str,
+        vidid: str,
+        seconds: int = 0,
+        user_id: Optional[int] = None,
+    ):
+        self.title = title
+        self.dur = dur
+        self.streamtype = streamtype
+        self.by = by
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.file = file
+        self.vidid = vidid
+        self.mystic = None
+        self.messages: List = []
+        self.markup = None
+        self.speed = 1.0
+        self.old_dur = None
+        self.old_second = None
+        self._seconds = int(seconds or 0)
+        self._queue: Optional["ChatQueue"] = None
+        self._started: Optional[float] = None
+        self._paused_at: Optional[float] = None
+        self._paused_total = 0.0
+        self._held: List[str] = []
+
+    @property
+    def seconds(self) -> int:
+        return self._seconds
+
+    @seconds.setter
+    def seconds(self, value: int) -> None:
+        value = int(value or 0)
+        if self._queue is not None:
+            self._queue._total += value - self._seconds
+        self._seconds = value
+
+    @property
+    def played(self) -> int:
+        if self._started is None:
+            return 0
+        now = self._paused_at or time.monotonic()
+        position = int(now - self._started - self._paused_total)
+        if self._seconds:
+            position = min(position, self._seconds)
+        return max(0, position)
+
+    @played.setter
+    def played(self, value: int) -> None:
+        now = time.monotonic()
+        self._started = now - int(value or 0)
+        self._paused_total = 0.0
+        if self._paused_at is not None:
+            self._paused_at = now
+
+    def pause(self) -> None:
+        if self._started is not None and self._paused_at is None:
+            self._paused_at = time.monotonic()
+
+    def resume(self) -> None:
+        if self._paused_at is not None:
+            self._paused_total += time.monotonic() - self._paused_at
+            self._paused_at = None
+
+    def hold(self, path: Optional[str]) -> None:
+        """
+        Pin the file this entry was resolved to (``file`` is only ``vid_<id>`` for
+        queued YouTube tracks) so the media cache cannot evict it while queued or playing.
+        """
+        if self._queue is None or not path or path in self._held or not os.path.isfile(path):
+            return
+        self._held.append(path)
+        media_cache.pin(path)
+
+    def release(self) -> None:
+        """Unpin the files taken by ``hold``; called when the entry leaves its queue."""
+        held, self._held = self._held, []
+        for path in held:
+            media_cache.unpin(path)
+
+    def announce(self, messages: List, markup: str) -> None:
+        """Keep the now-playing messages sent for this track; the first one is its ``mystic``."""
+        self.messages = list(messages or [])
+        self.mystic = self.messages[0] if self.messages else None
+        self.markup = markup
+
+    def reset_speed(self) -> None:
+        """Drop a previous /speed change so the track restarts at normal speed."""
+        if not self.old_dur:
+            return
+        self.dur = self.old_dur
+        self.seconds = self.old_second
+        self.speed = 1.0
+        self.old_dur = None
+        self.old_second = None
+
+    def __repr__(self) -> str:
+        return f"<QueueEntry {self.vidid} {self.title[:20]!r} {self.dur}>"
+
+
+class ChatQueue:
+    """
+    Per-chat queue with O(1) pop-front and a running total of queued seconds,
+    so ``remaining`` (head) and ``wait_time`` (tail) are O(1). The playback clock
+    of an entry starts when it becomes the head of the queue.
+    """
+
+    __slots__ = ("_items", "_total")
+
+    def __init__(self, entries: Iterable[QueueEntry] = ()):
+        self._items = deque()
+        self._total = 0
+        for entry in entries:
+            self.append(entry)
+
+    def _adopt(self, entry: QueueEntry) -> QueueEntry:
+        entry._queue = self
+        self._total += entry.seconds
+        return entry
+
+    def _release(self, entry: QueueEntry) -> QueueEntry:
+        entry._queue = None
+        self._total -= entry.seconds
+        return entry
+
+    def _promote(self) -> None:
+        if self._items:
+            self._items[0].played = 0
+
+    def append(self, entry: QueueEntry) -> None:
+        self._items.append(self._adopt(entry))
+        if len(self._items) == 1:
+            self._promote()
+
+    def insert(self, index: int, entry: QueueEntry) -> None:
+        if index == 0:
+            self._items.appendleft(self._adopt(entry))
+            self._promote()
+        else:
+            self._items.insert(index, self._adopt(entry))
+
+    def pop(self, index: int = -1) -> QueueEntry:
+        if index == 0:
+            entry = self._release(self._items.popleft())
+            self._promote()
+            return entry
+        if index == -1:
+            return self._release(self._items.pop())
+        entry = self._items[index]
+        del self._items[index]
+        return self._release(entry)
+
+    def clear(self) -> None:
+        for entry in self._items:
+            entry._queue = None
+        self._items.clear()
+        self._total = 0
+
+    def shuffle_upcoming(self) -> None:
+        """Shuffle everything after the currently playing entry; needs two or more upcoming."""
+        if len(self._items) < 3:
+            return
+        head = self._items.popleft()
+        rest = list(self._items)
+        random.shuffle(rest)
+        self._items = deque(rest)
+        self._items.appendleft(head)
+
+    @property
+    def total_seconds(self) -> int:
+        return self._total
+
+    def remaining(self) -> int:
+        """Seconds left until the queue runs dry."""
+        if not self._items:
+            return 0
+        return max(0, self._total - int(self._items[0].played))
+
+    def wait_time(self) -> int:
+        """Seconds until the last entry starts playing; O(1), from the running total."""
+        if not self._items:
+            return 0
+        return max(0, self.remaining() - self._items[-1].seconds)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[QueueEntry]:
+        return iter(self._items)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[QueueEntry, List[QueueEntry]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self._items))
+            if step == 1:
+                # walks only up to ``stop`` instead of copying the whole deque
+                return list(islice(self._items, start, stop))
+            return list(self._items)[index]
+        return self._items[index]
+
+    def __repr__(self) -> str:
+        return f"<ChatQueue {len(self._items)} entries, {self._total}s>"
+
+
+def _enqueue(chat_id, entry: QueueEntry, forceplay) -> None:
+    if forceplay:
+        check = db.get(chat_id)
+        if check:
+            check.insert(0, entry)
+        else:
+            db[chat_id] = ChatQueue([entry])
+    else:
+        db.setdefault(chat_id, ChatQueue()).append(entry)
+
+
 async def put_queue(
     chat_id,
     original_chat_id,
@@ -23,28 +281,21 @@ async def put_queue(
         duration_in_seconds = time_to_seconds(duration) - 3
     except:
         duration_in_seconds = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "user_id": user_id,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": duration_in_seconds,
-        "played": 0,
-    }
-    if forceplay:
-        check = db.get(chat_id)
-        if check:
-            check.insert(0, put)
-        else:
-            db[chat_id] = []
-            db[chat_id].append(put)
-    else:
-        db[chat_id].append(put)
+    put = QueueEntry(
+        title=title,
+        dur=duration,
+        streamtype=stream,
+        by=user,
+        user_id=user_id,
+        chat_id=original_chat_id,
+        file=file,
+        vidid=vidid,
+        seconds=duration_in_seconds,
+    )
+    _enqueue(chat_id, put, forceplay)
     autoclean.append(file)
+    media_cache.pin(file)
+    prefetcher.refresh(chat_id)
 
 
 async def put_queue_index(
@@ -60,32 +311,21 @@ async def put_queue_index(
 ):
     if "20.212.146.162" in vidid:
         try:
-            dur = await asyncio.get_event_loop().run_in_executor(
-                None, check_duration, vidid
-            )
+            dur = int(await media_info.duration(vidid))
             duration = seconds_to_min(dur)
         except:
             duration = "ᴜʀʟ sᴛʀᴇᴀᴍ"
             dur = 0
     else:
         dur = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": dur,
-        "played": 0,
-    }
-    if forceplay:
-        check = db.get(chat_id)
-        if check:
-            check.insert(0, put)
-        else:
-            db[chat_id] = []
-            db[chat_id].append(put)
-    else:
-        db[chat_id].append(put)
+    put = QueueEntry(
+        title=title,
+        dur=duration,
+        streamtype=stream,
+        by=user,
+        chat_id=original_chat_id,
+        file=file,
+        vidid=vidid,
+        seconds=dur,
+    )
+    _enqueue(chat_id, put, forceplay)
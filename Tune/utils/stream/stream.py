@@ -1,6 +1,9 @@
+import asyncio
+import contextlib
 import os
+from collections import deque
 from random import randint
-from typing import Union
+from typing import AsyncIterator, Iterable, Tuple, Union
 
 from pyrogram.types import InlineKeyboardMarkup
 
@@ -8,88 +11,49 @@ import config
 from Tune import Carbon, YouTube, app
 from Tune.core.call import JARVIS
 from Tune.misc import db
-from Tune.utils.database import add_active_video_chat, is_active_chat, get_chat_topics
+from Tune.utils.database import add_active_video_chat, is_active_chat
+from Tune.utils.dlqueue import Priority, download_priority
 from Tune.utils.exceptions import AssistantErr
 from Tune.utils.inline import aq_markup, close_markup, stream_markup
+from Tune.utils.messaging import send_message_to_topics, send_photo_to_topics
 from Tune.utils.pastebin import TuneBin
-from Tune.utils.stream.queue import put_queue, put_queue_index
+from Tune.utils.progress import progress_updater
+from Tune.utils.stream.queue import ChatQueue, put_queue, put_queue_index
 from Tune.utils.thumbnails import get_thumb
+from Tune.utils.tuning import PLAYLIST_CONCURRENCY
 from Tune.utils.errors import capture_internal_err
 
 
-async def send_photo_to_topics(chat_id, photo, caption, reply_markup=None):
+async def _resolve_playlist(items: Iterable[str]) -> AsyncIterator[Tuple]:
     """
-    Send photo to all topics in a chat if topics exist, otherwise send to main chat.
-    Returns the message object from the first successful send (for compatibility).
+    Yield ``YouTube.details`` for each playlist entry in order, resolving up to
+    ``PLAYLIST_CONCURRENCY`` entries ahead of the one being consumed.
+    Entries that fail to resolve are skipped.
     """
-    # Get all topics for this chat
-    topics = await get_chat_topics(chat_id)
-    
-    if not topics:
-        # No topics configured, send to main chat
-        return await app.send_photo(
-            chat_id=chat_id,
-            photo=photo,
-            caption=caption,
-            reply_markup=reply_markup,
-        )
-    
-    # Send to all topics
-    messages = []
-    for topic_id in topics:
-        try:
-            message = await app.send_photo(
-                chat_id=chat_id,
-                photo=photo,
-                caption=caption,
-                reply_markup=reply_markup,
-                message_thread_id=topic_id,  # This is the key parameter for topics
-            )
-            messages.append(message)
-        except Exception as e:
-            # Log error but continue with other topics
-            print(f"Failed to send to topic {topic_id} in chat {chat_id}: {e}")
-            continue
-    
-    # Return the first message for compatibility with existing code
-    return messages[0] if messages else None
 
-async def send_message_to_topics(chat_id, text, reply_markup=None, disable_web_page_preview=True):
-    """
-    Send message to all topics in a chat if topics exist, otherwise send to main chat.
-    Returns the message object from the first successful send (for compatibility).
-    """
-    # Get all topics for this chat
-    topics = await get_chat_topics(chat_id)
-    
-    if not topics:
-        # No topics configured, send to main chat
-        return await app.send_message(
-            chat_id=chat_id,
-            text=text,
-            reply_markup=reply_markup,
-            disable_web_page_preview=disable_web_page_preview,
-        )
-    
-    # Send to all topics
-    messages = []
-    for topic_id in topics:
+    async def resolve(search):
         try:
-            message = await app.send_message(
-                chat_id=chat_id,
-                text=text,
-                reply_markup=reply_markup,
-                disable_web_page_preview=disable_web_page_preview,
-                message_thread_id=topic_id,
-            )
-            messages.append(message)
-        except Exception as e:
-            # Log error but continue with other topics
-            print(f"Failed to send message to topic {topic_id} in chat {chat_id}: {e}")
-            continue
-    
-    # Return the first message for compatibility with existing code
-    return messages[0] if messages else None
+            return await YouTube.details(search, videoid=search)
+        except Exception:
+            return None
+
+    pending = deque()
+    source = iter(items)
+    try:
+        while True:
+            while len(pending) < PLAYLIST_CONCURRENCY:
+                search = next(source, None)
+                if search is None:
+                    break
+                pending.append(asyncio.create_task(resolve(search)))
+            if not pending:
+                return
+            details = await pending.popleft()
+            if details:
+                yield details
+    finally:
+        for task in pending:
+            task.cancel()
 
 
 @capture_internal_err
@@ -120,83 +84,77 @@ async def stream(
         count = 0
         position = 0
 
-        for search in result:
-            if int(count) == config.PLAYLIST_FETCH_LIMIT:
-                continue
-            try:
-                title, duration_min, duration_sec, thumbnail, vidid = await YouTube.details(
-                    search, videoid=search
-                )
-            except Exception:
-                continue
-
-            if str(duration_min) == "None":
-                continue
-            if duration_sec and duration_sec > config.DURATION_LIMIT:
-                continue
+        async with contextlib.aclosing(_resolve_playlist(result)) as tracks:
+            async for title, duration_min, duration_sec, thumbnail, vidid in tracks:
+                if int(count) == config.PLAYLIST_FETCH_LIMIT:
+                    break
+                if str(duration_min) == "None":
+                    continue
+                if duration_sec and duration_sec > config.DURATION_LIMIT:
+                    continue
 
-            if await is_active_chat(chat_id):
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if is_video else "audio",
-                )
-                position = len(db.get(chat_id)) - 1
-                count += 1
-                msg += f"{count}. {title[:70]}\n"
-                msg += f"{_['play_20']} {position}\n\n"
-            else:
-                if not forceplay:
-                    db[chat_id] = []
-                try:
-                    file_path, direct = await YouTube.download(
-                        vidid, mystic, video=is_video, videoid=vidid
+                if await is_active_chat(chat_id):
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        f"vid_{vidid}",
+                        title,
+                        duration_min,
+                        user_name,
+                        vidid,
+                        user_id,
+                        "video" if is_video else "audio",
                     )
-                except Exception:
-                    raise AssistantErr(_["play_14"])
-                if not file_path:
-                    raise AssistantErr(_["play_14"])
+                    position = len(db.get(chat_id)) - 1
+                    count += 1
+                    msg += f"{count}. {title[:70]}\n"
+                    msg += f"{_['play_20']} {position}\n\n"
+                else:
+                    if not forceplay:
+                        db[chat_id] = ChatQueue()
+                    try:
+                        with download_priority(Priority.PLAYING, chat_id):
+                            file_path, direct = await YouTube.download(
+                                vidid, mystic, video=is_video, videoid=vidid
+                            )
+                    except Exception:
+                        raise AssistantErr(_["play_14"])
+                    if not file_path:
+                        raise AssistantErr(_["play_14"])
 
-                await JARVIS.join_call(
-                    chat_id,
-                    original_chat_id,
-                    file_path,
-                    video=is_video,
-                    image=thumbnail,
-                )
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    file_path if direct else f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if is_video else "audio",
-                    forceplay=forceplay,
-                )
-                img = await get_thumb(vidid)
-                button = stream_markup(_, chat_id)
-                run = await send_photo_to_topics(
-                    original_chat_id,
-                    photo=img,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{vidid}",
-                        title[:23],
+                    await JARVIS.join_call(
+                        chat_id,
+                        original_chat_id,
+                        file_path,
+                        video=is_video,
+                        image=thumbnail,
+                    )
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        file_path if direct else f"vid_{vidid}",
+                        title,
                         duration_min,
                         user_name,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                        vidid,
+                        user_id,
+                        "video" if is_video else "audio",
+                        forceplay=forceplay,
+                    )
+                    img = await get_thumb(vidid)
+                    button = stream_markup(_, chat_id)
+                    run = await send_photo_to_topics(
+                        original_chat_id,
+                        photo=img,
+                        caption=_["stream_1"].format(
+                            f"https://t.me/{app.username}?start=info_{vidid}",
+                            title[:23],
+                            duration_min,
+                            user_name,
+                        ),
+                        reply_markup=InlineKeyboardMarkup(button),
+                    )
+                    progress_updater.announce(chat_id, run, "stream")
 
         if count == 0:
             return
@@ -227,9 +185,10 @@ async def stream(
         thumbnail = result["thumb"]
 
         try:
-            file_path, direct = await YouTube.download(
-                vidid, mystic, video=is_video, videoid=vidid
-            )
+            with download_priority(Priority.PLAYING, chat_id):
+                file_path, direct = await YouTube.download(
+                    vidid, mystic, video=is_video, videoid=vidid
+                )
         except Exception:
             raise AssistantErr(_["play_14"])
         if not file_path:
@@ -256,7 +215,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             await JARVIS.join_call(
                 chat_id,
                 original_chat_id,
@@ -289,8 +248,7 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            progress_updater.announce(chat_id, run, "stream")
 
     elif streamtype == "soundcloud":
         file_path = result["filepath"]
@@ -320,7 +278,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             await JARVIS.join_call(chat_id, original_chat_id, file_path, video=False)
             await put_queue(
                 chat_id,
@@ -343,8 +301,7 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            progress_updater.announce(chat_id, run, "tg")
 
     elif streamtype == "telegram":
         file_path = result["path"]
@@ -375,7 +332,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             await JARVIS.join_call(chat_id, original_chat_id, file_path, video=is_video)
             await put_queue(
                 chat_id,
@@ -398,8 +355,7 @@ async def stream(
                 caption=_["stream_1"].format(link, title[:23], duration_min, user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            progress_updater.announce(chat_id, run, "tg")
 
     elif streamtype == "live":
         link = result["link"]
@@ -429,7 +385,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             n, file_path = await YouTube.video(link)
             if n == 0:
                 raise AssistantErr(_["str_3"])
@@ -468,8 +424,7 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            progress_updater.announce(chat_id, run, "tg")
 
     elif streamtype == "index":
         link = result
@@ -495,7 +450,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             await JARVIS.join_call(
                 chat_id,
                 original_chat_id,
@@ -520,6 +475,5 @@ async def stream(
                 caption=_["stream_2"].format(user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            progress_updater.announce(chat_id, run, "tg")
             await mystic.delete()
\ No newline at end of file
@@ -0,0 +1,33 @@
+from typing import Optional
+
+from pytgcalls.types import AudioQuality, MediaStream, VideoQuality
+
+# What the call path asks ntgcalls for; cached media is normalized to match.
+AUDIO_QUALITY = AudioQuality.STUDIO
+VIDEO_AUDIO_QUALITY = AudioQuality.MEDIUM
+VIDEO_QUALITY = VideoQuality.HD_720p
+AUDIO_ONLY_VIDEO_QUALITY = VideoQuality.SD_360p
+
+
+def audio_format(video: bool = False):
+    """(sample rate, channels) delivered to the call."""
+    rate, channels = (VIDEO_AUDIO_QUALITY if video else AUDIO_QUALITY).value[:2]
+    return rate, channels
+
+
+def video_geometry():
+    """(width, height, fps) delivered to the call."""
+    width, height, fps = VIDEO_QUALITY.value[:3]
+    return width, height, fps
+
+
+def media_stream(path: str, video: bool = False, ffmpeg_params: Optional[str] = None) -> MediaStream:
+    """The ``MediaStream`` every call is played with."""
+    return MediaStream(
+        audio_path=path,
+        media_path=path,
+        audio_parameters=VIDEO_AUDIO_QUALITY if video else AUDIO_QUALITY,
+        video_parameters=VIDEO_QUALITY if video else AUDIO_ONLY_VIDEO_QUALITY,
+        video_flags=(MediaStream.Flags.AUTO_DETECT if video else MediaStream.Flags.IGNORE),
+        ffmpeg_parameters=ffmpeg_params,
+    )
@@ -1,60 +1,113 @@
+import asyncio
+import bisect
+import importlib.util
+import multiprocessing
 import os
 import re
-import aiofiles
-import aiohttp
-from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
-from youtubesearchpython.__future__ import VideosSearch
+import site
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
 from config import YOUTUBE_IMG_URL
 from Tune.core.dir import CACHE_DIR 
+from Tune.logging import LOGGER
+from Tune.utils.downloader import get_session
+from Tune.utils.metacache import video_info
+from Tune.utils.tuning import THUMB_QUEUE, THUMB_WORKERS
+
+
+# Upper bounds (ms) of the render-time histogram buckets; the last bucket is open.
+RENDER_BUCKETS = (50, 100, 250, 500, 1000, 2500)
+
+# the render code is imported by path so pool workers never import (and start) the Tune package
+_RENDER_DIR = os.path.dirname(os.path.abspath(__file__))
+_spec = importlib.util.spec_from_file_location("thumbrender", os.path.join(_RENDER_DIR, "thumbrender.py"))
+thumbrender = sys.modules["thumbrender"] = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(thumbrender)
+
+
+class ThumbRenderer:
+    """
+    Renders thumbnails in a process pool. At most ``limit`` renders are queued;
+    beyond that callers get the fallback image instead of waiting.
+    """
+
+    def __init__(self, workers: int, limit: int):
+        self.workers = workers
+        self.limit = limit
+        self.histogram = [0] * (len(RENDER_BUCKETS) + 1)
+        self.dropped = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # workers fork from a single-threaded server, never from the threaded bot process
+                mp_context=multiprocessing.get_context("forkserver"),
+                # puts thumbrender on the worker's path so render jobs unpickle without Tune
+                initializer=site.addsitedir,
+                initargs=(_RENDER_DIR,),
+            )
+        return self._pool
+
+    def _observe(self, seconds: float) -> None:
+        self.histogram[bisect.bisect_left(RENDER_BUCKETS, seconds * 1000)] += 1
+
+    def stats(self) -> Dict[str, int]:
+        labels = [f"<={b}ms" for b in RENDER_BUCKETS] + [f">{RENDER_BUCKETS[-1]}ms"]
+        out = dict(zip(labels, self.histogram))
+        out.update(queued=self._pending, dropped=self.dropped)
+        return out
+
+    async def render(self, cache_path: str, *args) -> Optional[str]:
+        if cache_path in self._inflight:
+            return await asyncio.shield(self._inflight[cache_path])
+        if self._pending >= self.limit:
+            self.dropped += 1
+            return None
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[cache_path] = future
+        self._pending += 1
+        result = None
+        try:
+            took = await loop.run_in_executor(self._executor(), thumbrender.render, cache_path, *args)
+            self._observe(took)
+            result = cache_path
+        except Exception as e:
+            LOGGER(__name__).warning(f"Thumbnail render failed: {e}")
+            if isinstance(e, RuntimeError) and self._pool is not None:
+                # a broken pool (e.g. a worker was killed) is rebuilt on the next render
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+        finally:
+            self._pending -= 1
+            self._inflight.pop(cache_path, None)
+            future.set_result(result)
+        return result
+
+
+renderer = ThumbRenderer(THUMB_WORKERS, THUMB_QUEUE)
+
+
+def render_histogram() -> Dict[str, int]:
+    return renderer.stats()
 
 
-PANEL_W, PANEL_H = 763, 545
-PANEL_X = (1280 - PANEL_W) // 2
-PANEL_Y = 88
-TRANSPARENCY = 170
-INNER_OFFSET = 36
-
-THUMB_W, THUMB_H = 542, 273
-THUMB_X = PANEL_X + (PANEL_W - THUMB_W) // 2
-THUMB_Y = PANEL_Y + INNER_OFFSET
-
-TITLE_X = 377
-META_X = 377
-TITLE_Y = THUMB_Y + THUMB_H + 10
-META_Y = TITLE_Y + 45
-
-BAR_X, BAR_Y = 388, META_Y + 45
-BAR_RED_LEN = 280
-BAR_TOTAL_LEN = 480
-
-ICONS_W, ICONS_H = 415, 45
-ICONS_X = PANEL_X + (PANEL_W - ICONS_W) // 2
-ICONS_Y = BAR_Y + 48
-
-MAX_TITLE_WIDTH = 580
-
-def trim_to_width(text: str, font: ImageFont.FreeTypeFont, max_w: int) -> str:
-    ellipsis = "…"
-    if font.getlength(text) <= max_w:
-        return text
-    for i in range(len(text) - 1, 0, -1):
-        if font.getlength(text[:i] + ellipsis) <= max_w:
-            return text[:i] + ellipsis
-    return ellipsis
-
 async def get_thumb(videoid: str) -> str:
     cache_path = os.path.join(CACHE_DIR, f"{videoid}_v4.png")
     if os.path.exists(cache_path):
         return cache_path
 
     # YouTube video data fetch
-    results = VideosSearch(f"https://www.youtube.com/watch?v={videoid}", limit=1)
     try:
-        results_data = await results.next()
-        result_items = results_data.get("result", [])
-        if not result_items:
+        data = await video_info(videoid)
+        if not data:
             raise ValueError("No results found.")
-        data = result_items[0]
         title = re.sub(r"\W+", " ", data.get("title", "Unsupported Title")).title()
         thumbnail = data.get("thumbnails", [{}])[0].get("url", YOUTUBE_IMG_URL)
         duration = data.get("duration")
@@ -66,66 +119,14 @@ async def get_thumb(videoid: str) -> str:
     duration_text = "Live" if is_live else duration or "Unknown Mins"
 
     # Download thumbnail
-    thumb_path = os.path.join(CACHE_DIR, f"thumb{videoid}.png")
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(thumbnail) as resp:
-                if resp.status == 200:
-                    async with aiofiles.open(thumb_path, "wb") as f:
-                        await f.write(await resp.read())
+        session = await get_session()
+        async with session.get(thumbnail) as resp:
+            if resp.status != 200:
+                return YOUTUBE_IMG_URL
+            image = await resp.read()
     except Exception:
         return YOUTUBE_IMG_URL
 
-    # Create base image
-    base = Image.open(thumb_path).resize((1280, 720)).convert("RGBA")
-    bg = ImageEnhance.Brightness(base.filter(ImageFilter.BoxBlur(10))).enhance(0.6)
-
-    # Frosted glass panel
-    panel_area = bg.crop((PANEL_X, PANEL_Y, PANEL_X + PANEL_W, PANEL_Y + PANEL_H))
-    overlay = Image.new("RGBA", (PANEL_W, PANEL_H), (255, 255, 255, TRANSPARENCY))
-    frosted = Image.alpha_composite(panel_area, overlay)
-    mask = Image.new("L", (PANEL_W, PANEL_H), 0)
-    ImageDraw.Draw(mask).rounded_rectangle((0, 0, PANEL_W, PANEL_H), 50, fill=255)
-    bg.paste(frosted, (PANEL_X, PANEL_Y), mask)
-
-    # Draw details
-    draw = ImageDraw.Draw(bg)
-    try:
-        title_font = ImageFont.truetype("Tune/assets/thumb/font2.ttf", 32)
-        regular_font = ImageFont.truetype("Tune/assets/thumb/font.ttf", 18)
-    except OSError:
-        title_font = regular_font = ImageFont.load_default()
-
-    thumb = base.resize((THUMB_W, THUMB_H))
-    tmask = Image.new("L", thumb.size, 0)
-    ImageDraw.Draw(tmask).rounded_rectangle((0, 0, THUMB_W, THUMB_H), 20, fill=255)
-    bg.paste(thumb, (THUMB_X, THUMB_Y), tmask)
-
-    draw.text((TITLE_X, TITLE_Y), trim_to_width(title, title_font, MAX_TITLE_WIDTH), fill="black", font=title_font)
-    draw.text((META_X, META_Y), f"YouTube | {views}", fill="black", font=regular_font)
-
-    # Progress bar
-    draw.line([(BAR_X, BAR_Y), (BAR_X + BAR_RED_LEN, BAR_Y)], fill="red", width=6)
-    draw.line([(BAR_X + BAR_RED_LEN, BAR_Y), (BAR_X + BAR_TOTAL_LEN, BAR_Y)], fill="gray", width=5)
-    draw.ellipse([(BAR_X + BAR_RED_LEN - 7, BAR_Y - 7), (BAR_X + BAR_RED_LEN + 7, BAR_Y + 7)], fill="red")
-
-    draw.text((BAR_X, BAR_Y + 15), "00:00", fill="black", font=regular_font)
-    end_text = "Live" if is_live else duration_text
-    draw.text((BAR_X + BAR_TOTAL_LEN - (90 if is_live else 60), BAR_Y + 15), end_text, fill="red" if is_live else "black", font=regular_font)
-
-    # Icons
-    icons_path = "Tune/assets/thumb/play_icons.png"
-    if os.path.isfile(icons_path):
-        ic = Image.open(icons_path).resize((ICONS_W, ICONS_H)).convert("RGBA")
-        r, g, b, a = ic.split()
-        black_ic = Image.merge("RGBA", (r.point(lambda *_: 0), g.point(lambda *_: 0), b.point(lambda *_: 0), a))
-        bg.paste(black_ic, (ICONS_X, ICONS_Y), black_ic)
-
-    # Cleanup and save
-    try:
-        os.remove(thumb_path)
-    except OSError:
-        pass
-
-    bg.save(cache_path)
-    return cache_path
+    path = await renderer.render(cache_path, image, title, views, duration_text, is_live)
+    return path or YOUTUBE_IMG_URL
@@ -0,0 +1,118 @@
+"""
+Now-playing card rendering for the thumbnail process pool.
+
+Pool workers are started from the forkserver and import this file as a
+top-level module, so it must not import the ``Tune`` package: doing so would
+start the bot inside every worker.
+"""
+
+import io
+import os
+import time
+
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
+
+
+PANEL_W, PANEL_H = 763, 545
+PANEL_X = (1280 - PANEL_W) // 2
+PANEL_Y = 88
+TRANSPARENCY = 170
+INNER_OFFSET = 36
+
+THUMB_W, THUMB_H = 542, 273
+THUMB_X = PANEL_X + (PANEL_W - THUMB_W) // 2
+THUMB_Y = PANEL_Y + INNER_OFFSET
+
+TITLE_X = 377
+META_X = 377
+TITLE_Y = THUMB_Y + THUMB_H + 10
+META_Y = TITLE_Y + 45
+
+BAR_X, BAR_Y = 388, META_Y + 45
+BAR_RED_LEN = 280
+BAR_TOTAL_LEN = 480
+
+ICONS_W, ICONS_H = 415, 45
+ICONS_X = PANEL_X + (PANEL_W - ICONS_W) // 2
+ICONS_Y = BAR_Y + 48
+
+MAX_TITLE_WIDTH = 580
+
+ICONS_PATH = "Tune/assets/thumb/play_icons.png"
+
+_title_font = None
+_regular_font = None
+_icons = None
+
+def trim_to_width(text: str, font: ImageFont.FreeTypeFont, max_w: int) -> str:
+    ellipsis = "…"
+    if font.getlength(text) <= max_w:
+        return text
+    for i in range(len(text) - 1, 0, -1):
+        if font.getlength(text[:i] + ellipsis) <= max_w:
+            return text[:i] + ellipsis
+    return ellipsis
+
+def init_worker() -> None:
+    """Load fonts and the recolored icon strip once per pool worker, on its first render."""
+    global _title_font, _regular_font, _icons
+    try:
+        _title_font = ImageFont.truetype("Tune/assets/thumb/font2.ttf", 32)
+        _regular_font = ImageFont.truetype("Tune/assets/thumb/font.ttf", 18)
+    except OSError:
+        _title_font = _regular_font = ImageFont.load_default()
+    if os.path.isfile(ICONS_PATH):
+        ic = Image.open(ICONS_PATH).resize((ICONS_W, ICONS_H)).convert("RGBA")
+        _icons = Image.new("RGBA", ic.size, (0, 0, 0, 0))
+        _icons.putalpha(ic.getchannel("A"))
+
+
+def render(
+    cache_path: str, image: bytes, title: str, views: str, duration_text: str, is_live: bool
+) -> float:
+    """Render the now-playing card into ``cache_path``; returns the render time in seconds."""
+    started = time.perf_counter()
+    if _title_font is None:
+        init_worker()
+    title_font, regular_font = _title_font, _regular_font
+
+    # Create base image
+    base = Image.open(io.BytesIO(image)).resize((1280, 720)).convert("RGBA")
+    bg = ImageEnhance.Brightness(base.filter(ImageFilter.BoxBlur(10))).enhance(0.6)
+
+    # Frosted glass panel
+    panel_area = bg.crop((PANEL_X, PANEL_Y, PANEL_X + PANEL_W, PANEL_Y + PANEL_H))
+    overlay = Image.new("RGBA", (PANEL_W, PANEL_H), (255, 255, 255, TRANSPARENCY))
+    frosted = Image.alpha_composite(panel_area, overlay)
+    mask = Image.new("L", (PANEL_W, PANEL_H), 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, PANEL_W, PANEL_H), 50, fill=255)
+    bg.paste(frosted, (PANEL_X, PANEL_Y), mask)
+
+    # Draw details
+    draw = ImageDraw.Draw(bg)
+
+    thumb = base.resize((THUMB_W, THUMB_H))
+    tmask = Image.new("L", thumb.size, 0)
+    ImageDraw.Draw(tmask).rounded_rectangle((0, 0, THUMB_W, THUMB_H), 20, fill=255)
+    bg.paste(thumb, (THUMB_X, THUMB_Y), tmask)
+
+    draw.text((TITLE_X, TITLE_Y), trim_to_width(title, title_font, MAX_TITLE_WIDTH), fill="black", font=title_font)
+    draw.text((META_X, META_Y), f"YouTube | {views}", fill="black", font=regular_font)
+
+    # Progress bar
+    draw.line([(BAR_X, BAR_Y), (BAR_X + BAR_RED_LEN, BAR_Y)], fill="red", width=6)
+    draw.line([(BAR_X + BAR_RED_LEN, BAR_Y), (BAR_X + BAR_TOTAL_LEN, BAR_Y)], fill="gray", width=5)
+    draw.ellipse([(BAR_X + BAR_RED_LEN - 7, BAR_Y - 7), (BAR_X + BAR_RED_LEN + 7, BAR_Y + 7)], fill="red")
+
+    draw.text((BAR_X, BAR_Y + 15), "00:00", fill="black", font=regular_font)
+    end_text = "Live" if is_live else duration_text
+    draw.text((BAR_X + BAR_TOTAL_LEN - (90 if is_live else 60), BAR_Y + 15), end_text, fill="red" if is_live else "black", font=regular_font)
+
+    # Icons
+    if _icons is not None:
+        bg.paste(_icons, (ICONS_X, ICONS_Y), _icons)
+
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    bg.save(tmp_path, format="PNG")
+    os.replace(tmp_path, cache_path)
+    return time.perf_counter() - started
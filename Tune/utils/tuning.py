@@ -1,13 +1,54 @@
 import os
-import asyncio
 
 CPU = os.cpu_count() or 4
 
 MAX_CONCURRENT = int(os.getenv("MAX_CONCURRENT", str(min(64, CPU * 8))))
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", str(64 * 1024)))
+YTDLP_WORKERS = int(os.getenv("YTDLP_WORKERS", str(max(2, min(8, CPU)))))
+YTDLP_WORKER_JOBS = int(os.getenv("YTDLP_WORKER_JOBS", "200"))
 
 YTDLP_TIMEOUT = int(os.getenv("YTDLP_TIMEOUT", "45"))
 YOUTUBE_META_TTL = int(os.getenv("YOUTUBE_META_TTL", "300"))
 YOUTUBE_META_MAX = int(os.getenv("YOUTUBE_META_MAX", "2048"))
+EXTRACTION_CACHE_MAX = int(os.getenv("EXTRACTION_CACHE_MAX", "32"))
+STREAM_URL_MARGIN = int(os.getenv("STREAM_URL_MARGIN", "300"))
+STREAM_URL_REFRESH = int(os.getenv("STREAM_URL_REFRESH", "900"))
+STREAM_URL_TTL = int(os.getenv("STREAM_URL_TTL", "1800"))
 
-SEM = asyncio.Semaphore(MAX_CONCURRENT)
+MEDIA_CACHE_BYTES = int(os.getenv("MEDIA_CACHE_MB", "4096")) * 1024 * 1024
+MEDIA_CACHE_POLICY = os.getenv("MEDIA_CACHE_POLICY", "lru").lower()
+MEDIAINFO_MAX = int(os.getenv("MEDIAINFO_MAX", "4096"))
+NORMALIZE_MEDIA = os.getenv("NORMALIZE_MEDIA", "False").lower() in ("1", "true", "yes")
+NORMALIZE_WORKERS = int(os.getenv("NORMALIZE_WORKERS", str(max(1, CPU // 4))))
+
+PREFETCH_DEPTH = int(os.getenv("PREFETCH_DEPTH", "2"))
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "4"))
+
+RACE_HEDGE_DELAY = float(os.getenv("RACE_HEDGE_DELAY", "3"))
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN = int(os.getenv("BREAKER_COOLDOWN", "120"))
+API_POLL_MAX = float(os.getenv("API_POLL_MAX", "8"))
+
+PLAYLIST_CONCURRENCY = int(os.getenv("PLAYLIST_CONCURRENCY", "6"))
+
+SETTINGS_FLUSH_INTERVAL = float(os.getenv("SETTINGS_FLUSH_INTERVAL", "2"))
+SETTINGS_FLUSH_BATCH = int(os.getenv("SETTINGS_FLUSH_BATCH", "500"))
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "0.1"))
+STATS_LOG_INTERVAL = int(os.getenv("STATS_LOG_INTERVAL", "600"))
+
+BROADCAST_RATE = float(os.getenv("BROADCAST_RATE", "20"))
+BROADCAST_WORKERS = int(os.getenv("BROADCAST_WORKERS", "8"))
+BROADCAST_RETRIES = int(os.getenv("BROADCAST_RETRIES", "3"))
+ASSISTANT_BROADCAST_RATE = float(os.getenv("ASSISTANT_BROADCAST_RATE", "0.5"))
+TOPIC_RATE = float(os.getenv("TOPIC_RATE", "5"))
+
+PROGRESS_INTERVAL = int(os.getenv("PROGRESS_INTERVAL", "6"))
+PROGRESS_RATE = int(os.getenv("PROGRESS_RATE", "25"))
+PROGRESS_MAX_BACKOFF = int(os.getenv("PROGRESS_MAX_BACKOFF", "300"))
+
+THUMB_WORKERS = int(os.getenv("THUMB_WORKERS", str(max(1, min(4, CPU // 2)))))
+THUMB_QUEUE = int(os.getenv("THUMB_QUEUE", "32"))
+
+PROGRESSIVE_STREAM = os.getenv("PROGRESSIVE_STREAM", "False").lower() in ("1", "true", "yes")
+PROGRESSIVE_BUFFER = int(os.getenv("PROGRESSIVE_BUFFER_KB", "768")) * 1024
+PROGRESSIVE_RW_TIMEOUT = int(os.getenv("PROGRESSIVE_RW_TIMEOUT", "20"))
@@ -0,0 +1,52 @@
+"""
+yt-dlp worker process for ``Tune.utils.ytdlpool``.
+
+Loaded by file path in a process started from the forkserver, so it must not
+import the ``Tune`` package: doing so would start the bot inside the worker.
+"""
+
+import json
+from typing import Dict
+
+BASE_OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "noplaylist": True,
+    "skip_download": True,
+    "socket_timeout": 30,
+    "retries": 3,
+}
+
+
+def main(conn) -> None:
+    """Worker loop: keeps one initialized YoutubeDL per option set and serves jobs from ``conn``."""
+    from yt_dlp import YoutubeDL
+
+    instances: Dict[str, YoutubeDL] = {}
+
+    def ydl_for(opts: Dict) -> YoutubeDL:
+        key = json.dumps(opts, sort_keys=True)
+        if key not in instances:
+            instances[key] = YoutubeDL(dict(BASE_OPTS, **opts))
+        return instances[key]
+
+    while True:
+        try:
+            op, url, opts = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            if op == "flat":
+                ydl = ydl_for(dict(opts, extract_flat="in_playlist", noplaylist=False))
+                info = ydl.extract_info(url, download=False)
+                result = [e.get("id") for e in info.get("entries") or [] if e and e.get("id")]
+            else:
+                ydl = ydl_for(opts)
+                result = ydl.sanitize_info(ydl.extract_info(url, download=False))
+            conn.send((True, result))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+if __name__ == "__ytdlp_worker__":
+    main(conn)  # noqa: F821 - passed in through run_path's init_globals
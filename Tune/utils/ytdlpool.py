@@ -0,0 +1,104 @@
+import asyncio
+import multiprocessing
+import os
+import runpy
+from typing import Dict, List, Optional
+
+from Tune.logging import LOGGER
+from Tune.utils.cookie_handler import cookiefile_path
+from Tune.utils.tuning import YTDLP_TIMEOUT, YTDLP_WORKER_JOBS, YTDLP_WORKERS
+
+# loaded by path so the worker never imports (and starts) the Tune package
+_WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ytdlp_worker.py")
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "jobs")
+
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(
+            target=runpy.run_path,
+            args=(_WORKER_PATH,),
+            kwargs={"init_globals": {"conn": child}, "run_name": "__ytdlp_worker__"},
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.jobs = 0
+
+    def close(self) -> None:
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+
+
+class YtdlpPool:
+    """
+    Long-lived yt-dlp worker processes fed over pipes. Each job has a timeout;
+    a worker that times out or reaches ``max_jobs`` is replaced by a fresh one.
+    """
+
+    def __init__(self, size: int, max_jobs: int, timeout: int):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        # forked from a single-threaded server, never from the threaded bot process
+        self._ctx = multiprocessing.get_context("forkserver")
+        self._idle: Optional[asyncio.Queue] = None
+
+    def _start(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(_Worker(self._ctx))
+        return self._idle
+
+    async def _recv(self, worker: _Worker):
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fd = worker.conn.fileno()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, self.timeout)
+        finally:
+            loop.remove_reader(fd)
+        return worker.conn.recv()
+
+    async def submit(self, op: str, url: str, opts: Optional[Dict] = None):
+        opts = dict(opts or {})
+        cookiefile = cookiefile_path()
+        if cookiefile:
+            opts.setdefault("cookiefile", cookiefile)
+        idle = self._start()
+        worker = await idle.get()
+        healthy = False
+        try:
+            worker.conn.send((op, url, opts))
+            ok, result = await self._recv(worker)
+            worker.jobs += 1
+            healthy = worker.jobs < self.max_jobs
+        except asyncio.TimeoutError:
+            LOGGER(__name__).warning(f"yt-dlp worker timed out on {url}, recycling it.")
+            raise
+        finally:
+            if not healthy:
+                worker.close()
+                worker = _Worker(self._ctx)
+            idle.put_nowait(worker)
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+    async def extract(self, url: str, opts: Optional[Dict] = None) -> Dict:
+        return await self.submit("info", url, opts)
+
+    async def playlist_ids(self, url: str, limit: int, opts: Optional[Dict] = None) -> List[str]:
+        return await self.submit("flat", url, dict(opts or {}, playlistend=limit))
+
+
+ytdlp_pool = YtdlpPool(YTDLP_WORKERS, YTDLP_WORKER_JOBS, YTDLP_TIMEOUT)
@@ -0,0 +1,160 @@
+import asyncio
+import copy
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from yt_dlp import YoutubeDL
+
+from Tune.logging import LOGGER
+from Tune.utils.metacache import MetaCache
+from Tune.utils.tuning import (
+    EXTRACTION_CACHE_MAX,
+    STREAM_URL_MARGIN,
+    STREAM_URL_REFRESH,
+    STREAM_URL_TTL,
+    YOUTUBE_META_TTL,
+)
+from Tune.utils.ytdlpool import ytdlp_pool
+
+_QUIET = {"quiet": True, "no_warnings": True}
+# googlevideo urls carry it as a query parameter, hls manifests as a path segment
+_EXPIRE_RE = re.compile(r"[/?&]expire[/=](\d+)")
+
+
+class Extraction:
+    """
+    One yt-dlp info dict for a url. Format selection, direct stream urls and
+    downloads are all derived from it, so a play extracts the page only once.
+    """
+
+    __slots__ = ("url", "info")
+
+    def __init__(self, url: str, info: Dict[str, Any]):
+        self.url = url
+        self.info = info
+
+    @property
+    def id(self) -> Optional[str]:
+        return self.info.get("id")
+
+    @property
+    def is_live(self) -> bool:
+        return bool(self.info.get("is_live"))
+
+    @property
+    def is_playlist(self) -> bool:
+        return self.info.get("_type") == "playlist"
+
+    def copy(self) -> Dict[str, Any]:
+        # yt-dlp mutates the dict it processes
+        return copy.deepcopy(self.info)
+
+    def process(self, opts: Dict, download: bool = False) -> Dict[str, Any]:
+        """Run format selection (and the download, if asked) without extracting again."""
+        with YoutubeDL(dict(_QUIET, **opts)) as ydl:
+            return ydl.process_ie_result(self.copy(), download=download)
+
+    async def stream_url(self, format_selector: str) -> Optional[str]:
+        loop = asyncio.get_running_loop()
+        info = await loop.run_in_executor(None, self.process, {"format": format_selector})
+        if info.get("url"):
+            return info["url"]
+        for fmt in info.get("requested_formats") or []:
+            if fmt.get("url"):
+                return fmt["url"]
+        return None
+
+
+# full info dicts (every format, captions) run to hundreds of KB each, so only
+# the few urls being played right now are kept
+_extractions = MetaCache(EXTRACTION_CACHE_MAX, YOUTUBE_META_TTL)
+
+
+async def get_extraction(url: str) -> Extraction:
+    """Cached extraction of ``url``; concurrent callers share one extractor round-trip."""
+
+    async def load() -> Extraction:
+        return Extraction(url, await ytdlp_pool.extract(url))
+
+    return await _extractions.get(url, load)
+
+
+def forget_extraction(url: str) -> None:
+    _extractions.invalidate(url)
+
+
+def url_expiry(url: str) -> Optional[float]:
+    """Unix time embedded in a signed stream url's ``expire`` parameter, if any."""
+    match = _EXPIRE_RE.search(url or "")
+    return float(match.group(1)) if match else None
+
+
+class StreamUrlCache:
+    """
+    Resolved stream urls keyed by (video id, quality). An entry is served until
+    its embedded expiry minus ``margin``; within ``refresh_ahead`` of that it is
+    re-resolved in the background while callers keep getting the current url.
+    """
+
+    def __init__(self, maxsize: int, margin: int, refresh_ahead: int, default_ttl: int):
+        self.maxsize = maxsize
+        self.margin = margin
+        self.refresh_ahead = refresh_ahead
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def _valid_until(self, url: str) -> float:
+        expires = url_expiry(url) or time.time() + self.default_ttl
+        return expires - self.margin
+
+    async def _resolve(self, key: Tuple[str, str], resolver: Callable[[], Awaitable[Optional[str]]]):
+        url = await resolver()
+        if url:
+            self._data[key] = (url, self._valid_until(url))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return url
+
+    def _start(self, key, resolver) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._resolve(key, resolver))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    def _refresh(self, key, resolver) -> None:
+        def done(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                LOGGER(__name__).debug(f"Refreshing stream url {key} failed: {task.exception()}")
+
+        if key not in self._inflight:
+            self._start(key, resolver).add_done_callback(done)
+
+    async def get(
+        self, video_id: str, quality: str, resolver: Callable[[], Awaitable[Optional[str]]]
+    ) -> Optional[str]:
+        key = (video_id, quality)
+        item = self._data.get(key)
+        if item:
+            url, valid_until = item
+            left = valid_until - time.time()
+            if left > 0:
+                self._data.move_to_end(key)
+                if left < self.refresh_ahead:
+                    self._refresh(key, resolver)
+                return url
+            self._data.pop(key, None)
+        return await asyncio.shield(self._start(key, resolver))
+
+    def invalidate(self, video_id: str, quality: str) -> None:
+        self._data.pop((video_id, quality), None)
+
+
+stream_urls = StreamUrlCache(
+    YOUTUBE_META_MAX, STREAM_URL_MARGIN, STREAM_URL_REFRESH, STREAM_URL_TTL
+)
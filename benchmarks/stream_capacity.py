@@ -0,0 +1,247 @@
+"""
+Group-call stream capacity benchmark.
+
+Starts N simulated call streams from local media files. Each stream takes the
+bot's MediaStream (Tune/utils/streamprofile.py), checks it as pytgcalls does
+before a play, and runs the ffmpeg commands pytgcalls.ffmpeg.build_command
+produces for it. A local consumer stands in for Telegram and pulls 10 ms audio
+frames (and video frames) from ffmpeg in real time.
+
+For audio-only and 720p video it reports:
+  - decode real-time factor of a single unthrottled stream
+  - CPU share, RSS and underruns per stream at each concurrency level
+  - streams per core (1 / CPU share of one real-time stream)
+
+Usage:
+    python benchmarks/stream_capacity.py --streams 1,4,8,16 --duration 20
+    python benchmarks/stream_capacity.py --audio song.webm --video clip.mp4 --json out.json
+
+Without --audio/--video, synthetic fixtures are generated with ffmpeg's lavfi
+sources, so results are comparable across machines and releases.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import psutil
+from pytgcalls.ffmpeg import build_command
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRAME_MS = 10
+
+
+def load_profile():
+    # loaded by path: importing the Tune package would start the bot
+    path = os.path.join(ROOT, "Tune", "utils", "streamprofile.py")
+    spec = importlib.util.spec_from_file_location("streamprofile", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+profile = load_profile()
+
+
+def make_fixture(directory: str, video: bool, seconds: int) -> str:
+    out = os.path.join(directory, "fixture_video.mp4" if video else "fixture_audio.webm")
+    if os.path.exists(out):
+        return out
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-y",
+           "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={seconds}"]
+    if video:
+        cmd += ["-f", "lavfi", "-i", f"testsrc2=size=1920x1080:rate=30:duration={seconds}",
+                "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+                "-c:a", "aac", "-ac", "2", out]
+    else:
+        cmd += ["-ac", "2", "-c:a", "libopus", "-b:a", "128k", out]
+    subprocess.run(cmd, check=True)
+    return out
+
+
+async def decoder_commands(path: str, video: bool) -> List[Dict]:
+    """
+    The ffmpeg pipelines ntgcalls would run for the bot's MediaStream of
+    ``path``. The stream is checked first, as pytgcalls does before a play,
+    so the video geometry is the probed one and not the requested quality.
+    """
+    media = profile.media_stream(path, video)
+    await media.check_stream()
+    audio = media._audio_parameters
+    pipes = [{
+        "kind": "audio",
+        "cmd": build_command("ffmpeg", media._ffmpeg_parameters, path, audio, [], media._headers),
+        "frame": audio.bitrate * audio.channels * 2 * FRAME_MS // 1000,
+        "interval": FRAME_MS / 1000,
+    }]
+    if video:
+        geometry = media._video_parameters
+        pipes.append({
+            "kind": "video",
+            "cmd": build_command("ffmpeg", media._ffmpeg_parameters, path, geometry, [], media._headers),
+            "frame": geometry.width * geometry.height * 3 // 2,
+            "interval": 1 / geometry.frame_rate,
+        })
+    return pipes
+
+
+class SimulatedStream:
+    """One call: its ffmpeg decoders and a consumer reading frames like ntgcalls does."""
+
+    def __init__(self, pipes: List[Dict], realtime: bool):
+        self.pipes = pipes
+        self.realtime = realtime
+        self.procs: List[asyncio.subprocess.Process] = []
+        self.frames = 0
+        self.underruns = 0
+        self.media_seconds = 0.0
+        self.wall = 0.0
+
+    async def _consume(self, proc, frame: int, interval: float, deadline: float, primary: bool):
+        start = time.monotonic()
+        n = 0
+        while time.monotonic() < deadline:
+            if self.realtime:
+                due = start + n * interval
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            try:
+                await proc.stdout.readexactly(frame)
+            except asyncio.IncompleteReadError:
+                break
+            if self.realtime and time.monotonic() - (start + n * interval) > interval:
+                self.underruns += 1
+            n += 1
+        if primary:
+            self.frames = n
+            self.media_seconds = n * interval
+            self.wall = time.monotonic() - start
+
+    async def run(self, seconds: float) -> None:
+        deadline = time.monotonic() + seconds
+        consumers = []
+        for i, pipe in enumerate(self.pipes):
+            proc = await asyncio.create_subprocess_exec(
+                *pipe["cmd"], stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+            self.procs.append(proc)
+            consumers.append(self._consume(proc, pipe["frame"], pipe["interval"], deadline, i == 0))
+        try:
+            await asyncio.gather(*consumers)
+        finally:
+            for proc in self.procs:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+
+
+def _sample(procs: List[asyncio.subprocess.Process], cpu: Dict[int, float]) -> float:
+    """Update the last known CPU seconds per process in ``cpu``; returns the summed RSS."""
+    rss = 0.0
+    for proc in procs:
+        try:
+            p = psutil.Process(proc.pid)
+            t = p.cpu_times()
+            cpu[proc.pid] = t.user + t.system
+            rss += p.memory_info().rss
+        except psutil.Error:
+            pass
+    return rss
+
+
+async def run_level(path: str, video: bool, count: int, seconds: float, realtime: bool = True) -> Dict:
+    pipes = await decoder_commands(path, video)
+    streams = [SimulatedStream(pipes, realtime) for _ in range(count)]
+    tasks = [asyncio.ensure_future(s.run(seconds)) for s in streams]
+    await asyncio.sleep(min(1.0, seconds / 4))
+    procs = [p for s in streams for p in s.procs]
+    cpu: Dict[int, float] = {}
+    _sample(procs, cpu)
+    cpu0 = sum(cpu.values())
+    t0 = t1 = time.monotonic()
+    rss_peak = 0.0
+    while not all(t.done() for t in tasks):
+        rss_peak = max(rss_peak, _sample(procs, cpu))
+        t1 = time.monotonic()
+        await asyncio.sleep(0.5)
+    await asyncio.gather(*tasks)
+    span = t1 - t0
+    cpu_share = (sum(cpu.values()) - cpu0) / span / count if span > 0 else 0.0
+    rtf = [s.media_seconds / s.wall for s in streams if s.wall]
+    return {
+        "streams": count,
+        "cpu_per_stream": round(cpu_share, 4),
+        "rss_per_stream_mb": round(rss_peak / count / 2**20, 1),
+        "underruns": sum(s.underruns for s in streams),
+        "realtime_factor": round(min(rtf), 2) if rtf else 0.0,
+    }
+
+
+async def bench(kind: str, path: str, levels: List[int], seconds: float) -> Dict:
+    video = kind == "video"
+    decode = await run_level(path, video, 1, seconds, realtime=False)
+    results = []
+    for n in levels:
+        result = await run_level(path, video, n, seconds)
+        results.append(result)
+        print(
+            f"{kind:>5} x{n:<4} cpu/stream {result['cpu_per_stream'] * 100:6.2f}%  "
+            f"rss/stream {result['rss_per_stream_mb']:7.1f} MiB  underruns {result['underruns']}"
+        )
+    clean = [r for r in results if not r["underruns"]] or results
+    share = max(r["cpu_per_stream"] for r in clean)
+    return {
+        "fixture": os.path.basename(path),
+        "decode_realtime_factor": decode["realtime_factor"],
+        "levels": results,
+        "streams_per_core": round(1 / share, 1) if share else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--audio", help="audio fixture (generated if omitted)")
+    parser.add_argument("--video", help="video fixture (generated if omitted)")
+    parser.add_argument("--streams", default="1,4,8,16", help="comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per level")
+    parser.add_argument("--only", choices=("audio", "video"), help="run a single profile")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    levels = [int(x) for x in args.streams.split(",") if x.strip()]
+    workdir = tempfile.mkdtemp(prefix="stream-capacity-")
+    fixture_len = int(args.duration * 3) + 5
+    kinds = [args.only] if args.only else ["audio", "video"]
+    given = {"audio": args.audio, "video": args.video}
+
+    report = {
+        "cores": psutil.cpu_count(logical=True),
+        "python": sys.version.split()[0],
+        "duration": args.duration,
+        "profiles": {},
+    }
+    for kind in kinds:
+        fixture = given[kind] or make_fixture(workdir, kind == "video", fixture_len)
+        result = asyncio.run(bench(kind, fixture, levels, args.duration))
+        report["profiles"][kind] = result
+        print(
+            f"{kind:>5}: decode RTF {result['decode_realtime_factor']}x, "
+            f"{result['streams_per_core']} streams/core"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
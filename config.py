@@ -24,6 +24,7 @@ WEB_APP = getenv("WEB_APP", False) # Set True only if deploy in Render or Koyeb
 # ───── Mongo & Logging ───── #
 MONGO_DB_URI = getenv("MONGO_DB_URI")
 LOGGER_ID = int(getenv("LOGGER_ID", -1002435242326))
+MEDIA_CHANNEL_ID = int(getenv("MEDIA_CHANNEL_ID") or 0)  # optional, private channel used as media storage
 
 # ── Limits (durations in min/sec; sizes in bytes) ──────────────────────────────
 DURATION_LIMIT_MIN = int(getenv("DURATION_LIMIT", 3600))